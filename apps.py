@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.core import checks
+
+
+class CrmConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "crm"
+
+    def ready(self):
+        # connect the signal receivers that keep caches and stats in sync
+        from . import response_cache, stats  # noqa: F401
+        from .idempotency import check_store
+
+        checks.register(check_store)
@@ -0,0 +1,13 @@
+"""
+ASGI entry point: serves /graphql/async (AsyncCRMGraphQLView) next to the
+WSGI /graphql view, e.g.
+
+    uvicorn alx_backend_graphql_crm.asgi:application --workers 4
+"""
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "alx_backend_graphql_crm.settings")
+
+application = get_asgi_application()
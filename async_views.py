@@ -0,0 +1,130 @@
+# crm/async_views.py
+"""
+ASGI GraphQL endpoint.
+
+``AsyncCRMGraphQLView`` serves the same schema, caches, cost limits and
+idempotency handling as ``CRMGraphQLView``. The request handling runs in a
+worker thread, so the event loop is never blocked on the database. A query's
+independent root fields, e.g. ``{ totalCustomers totalOrders allProducts }``,
+are split into one sub-operation each. Each is a plain synchronous
+``execute`` call wrapped in ``sync_to_async`` on a bounded thread pool
+(``GRAPHQL_ASYNC_THREADS``), and the calls are awaited together with
+``asyncio.gather``. Mutations still run serially, as the spec requires.
+
+Every thread that touches the ORM here closes its connection when done,
+since Django's per-request cleanup only reaches its own sync thread.
+"""
+import asyncio
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from graphql import (
+    DocumentNode,
+    ExecutionResult,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    execute,
+)
+
+from .views import CRMGraphQLView
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "GRAPHQL_ASYNC_THREADS", 8),
+                    thread_name_prefix="graphql-orm",
+                )
+    return _executor
+
+
+def split_root_fields(document, operation):
+    """One document per root selection of ``operation``, fragments kept."""
+    others = [definition for definition in document.definitions if definition is not operation
+              and not isinstance(definition, OperationDefinitionNode)]
+    documents = []
+    for selection in operation.selection_set.selections:
+        single = OperationDefinitionNode(
+            operation=operation.operation,
+            name=operation.name,
+            variable_definitions=operation.variable_definitions,
+            directives=operation.directives,
+            selection_set=SelectionSetNode(selections=(selection,)),
+        )
+        documents.append(DocumentNode(definitions=(single, *others)))
+    return documents
+
+
+def merge_results(results):
+    data, errors = {}, []
+    for result in results:
+        if result.data is None:
+            data = None
+        elif data is not None:
+            data.update(result.data)
+        errors.extend(result.errors or ())
+    return ExecutionResult(data=data, errors=errors or None)
+
+
+def execute_isolated(schema, document, context_value=None, **options):
+    """Run one sub-operation in a pool thread with its own DataLoaders."""
+    close_old_connections()
+    try:
+        if context_value is not None:
+            context_value = copy.copy(context_value)
+            vars(context_value).pop("loaders", None)
+        return execute(schema, document, context_value=context_value, **options)
+    finally:
+        close_old_connections()
+
+
+class AsyncCRMGraphQLView(CRMGraphQLView):
+    view_is_async = True
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # before Django 5.0, csrf_exempt() would hide the coroutine behind a sync wrapper
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        # the sync pipeline (body parsing, caches, transactions) runs off the loop
+        sync_dispatch = super().dispatch
+
+        def dispatch_isolated():
+            close_old_connections()
+            try:
+                return sync_dispatch(request, *args, **kwargs)
+            finally:
+                close_old_connections()
+
+        return await sync_to_async(dispatch_isolated, thread_sensitive=False)()
+
+    def execute_operation(self, schema, document, operation_ast, **execute_options):
+        if (
+            operation_ast is None
+            or operation_ast.operation != OperationType.QUERY
+            or len(operation_ast.selection_set.selections) < 2
+        ):
+            return super().execute_operation(schema, document, operation_ast, **execute_options)
+        return async_to_sync(self.execute_concurrently)(schema, document, operation_ast, execute_options)
+
+    async def execute_concurrently(self, schema, document, operation_ast, execute_options):
+        run = sync_to_async(execute_isolated, thread_sensitive=False, executor=get_executor())
+        results = await asyncio.gather(*(
+            run(schema, single, **execute_options)
+            for single in split_root_fields(document, operation_ast)
+        ))
+        return merge_results(results)
@@ -0,0 +1,107 @@
+# crm/benchmarks/asgi_load.py
+"""
+Load test: WSGI /graphql against ASGI /graphql/async.
+
+Both servers must already be running on the same database, e.g.
+
+    gunicorn alx_backend_graphql_crm.wsgi --workers 4 --threads 8 -b :8000
+    uvicorn alx_backend_graphql_crm.asgi:application --workers 4 --port 8001
+    python -m crm.benchmarks.asgi_load --requests 2000 --concurrency 64
+
+Each query is POSTed ``--requests`` times from ``--concurrency`` client
+threads at both endpoints. Reported per endpoint and query: throughput,
+p50/p95/p99 latency and failures. The dashboard query has independent root
+fields, which the ASGI view resolves concurrently. The single-field query
+shows the overhead of the async path when there is nothing to overlap.
+Set ``GRAPHQL_RESPONSE_CACHE = False`` on both servers to measure execution
+rather than response cache hits.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+QUERIES = {
+    "dashboard": """
+        { totalCustomers totalOrders totalRevenue
+          allProducts(first: 50) { edges { node { name stock } } }
+          allOrders(first: 50) { edges { node { totalAmount customer { name } } } } }
+    """,
+    "single": "{ allOrders(first: 50) { edges { node { totalAmount customer { name } } } } }",
+}
+
+
+def post(session, url, query):
+    start = time.perf_counter()
+    try:
+        response = session.post(url, json={"query": query}, timeout=30)
+        ok = response.status_code == 200 and not response.json().get("errors")
+        outcome = "ok" if ok else f"HTTP {response.status_code}"
+    except (requests.RequestException, ValueError) as exc:
+        outcome = type(exc).__name__
+    return (time.perf_counter() - start) * 1000, outcome
+
+
+def run(url, query, total, concurrency):
+    local = threading.local()
+
+    def call(_):
+        # one keep-alive session per client thread
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return post(local.session, url, query)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(call, range(total)))
+    elapsed = time.perf_counter() - start
+
+    timings = sorted(ms for ms, _ in samples)
+    outcomes = Counter(outcome for _, outcome in samples)
+    pick = lambda q: timings[min(len(timings) - 1, int(q * len(timings)))]  # noqa: E731
+    return {
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(pick(0.50), 2),
+        "p95_ms": round(pick(0.95), 2),
+        "p99_ms": round(pick(0.99), 2),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "failures": total - outcomes["ok"],
+        "outcomes": dict(outcomes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the WSGI and ASGI GraphQL endpoints under load.")
+    parser.add_argument("--wsgi-url", default="http://localhost:8000/graphql")
+    parser.add_argument("--asgi-url", default="http://localhost:8001/graphql/async")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'query':<12}{'endpoint':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'failed':>8}")
+    for name, query in QUERIES.items():
+        for endpoint, url in (("wsgi", args.wsgi_url), ("asgi", args.asgi_url)):
+            run(url, query, args.warmup, min(args.concurrency, args.warmup))
+            result = run(url, query, args.requests, args.concurrency)
+            result.update(query=name, endpoint=endpoint)
+            results.append(result)
+            print(
+                f"{name:<12}{endpoint:<8}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}"
+                f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['failures']:>8}"
+            )
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"concurrency": args.concurrency, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# crm/benchmarks/dataset.py
+"""
+Synthetic dataset builder for the benchmarks.
+
+Seeds customers, products and orders (with line items) with ``bulk_create``
+in fixed-size chunks, so 1M rows fit in flat memory on a laptop SQLite.
+Values are drawn from a seeded RNG so every run builds the same data.
+
+    python -m crm.benchmarks.dataset --customers 100000 --orders 100000
+"""
+import argparse
+import os
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "alx_backend_graphql_crm.settings")
+django.setup()
+
+from django.db import transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from crm.models import Customer, Order, OrderItem, Product  # noqa: E402
+from crm.stats import rebuild_stats  # noqa: E402
+
+HISTORY_DAYS = 730
+
+
+@contextmanager
+def explicit_created_at():
+    """Let bulk_create keep the spread-out created_at values we generate."""
+    field = Customer._meta.get_field("created_at")
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def _chunks(count, size):
+    for start in range(0, count, size):
+        yield start, min(size, count - start)
+
+
+def build_dataset(customers=10_000, orders=None, products=1_000, items_per_order=3,
+                  seed=0, chunk_size=5_000, log=print):
+    """
+    Insert the dataset into the configured database.
+
+    ``orders`` defaults to ``customers``. Returns the row counts created.
+    """
+    orders = customers if orders is None else orders
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    def past(days=HISTORY_DAYS):
+        return now - timedelta(seconds=rng.randrange(days * 86400))
+
+    with transaction.atomic():
+        Product.objects.bulk_create(
+            Product(
+                name=f"Product {i}",
+                price=Decimal(rng.randrange(100, 200_000)) / 100,
+                stock=rng.randrange(0, 200),
+            )
+            for i in range(products)
+        )
+    product_prices = dict(Product.objects.values_list("id", "price"))
+    product_ids = list(product_prices)
+    log(f"products: {products}")
+
+    with explicit_created_at():
+        for start, size in _chunks(customers, chunk_size):
+            with transaction.atomic():
+                Customer.objects.bulk_create([
+                    Customer(
+                        name=f"Customer {i}",
+                        email=f"customer{i}@example.com",
+                        email_normalized=f"customer{i}@example.com",
+                        phone=f"+1{rng.randrange(10**9, 10**10)}" if i % 3 else None,
+                        created_at=past(),
+                    )
+                    for i in range(start, start + size)
+                ])
+            log(f"customers: {start + size}/{customers}")
+
+    customer_ids = list(Customer.objects.values_list("id", flat=True))
+    for start, size in _chunks(orders, chunk_size):
+        with transaction.atomic():
+            created = Order.objects.bulk_create([
+                Order(customer_id=rng.choice(customer_ids), order_date=past())
+                for _ in range(size)
+            ])
+            items = []
+            for order in created:
+                for product_id in rng.sample(product_ids, min(items_per_order, len(product_ids))):
+                    items.append(OrderItem(
+                        order_id=order.pk,
+                        product_id=product_id,
+                        quantity=rng.randrange(1, 5),
+                        unit_price=product_prices[product_id],
+                    ))
+            OrderItem.objects.bulk_create(items)
+            Order.objects.filter(pk__in=[order.pk for order in created]).update_totals()
+        log(f"orders: {start + size}/{orders}")
+
+    # bulk_create skips the signals that maintain the counters
+    rebuild_stats()
+    return {"customers": customers, "products": products, "orders": orders}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic CRM dataset.")
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--orders", type=int, default=None)
+    parser.add_argument("--products", type=int, default=1_000)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=5_000)
+    args = parser.parse_args()
+    build_dataset(
+        customers=args.customers, orders=args.orders, products=args.products,
+        items_per_order=args.items_per_order, seed=args.seed, chunk_size=args.chunk_size,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# crm/benchmarks/document_cache.py
+"""
+Parse/validate overhead per request, with and without the document cache.
+
+Usage (from the project root):
+
+    python -m crm.benchmarks.document_cache --iterations 5000
+
+Times the three documents that hit /graphql most often: the cron heartbeat,
+the order reminder query and the weekly report query.
+"""
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "alx_backend_graphql_crm.settings")
+django.setup()
+
+from graphene_django.settings import graphene_settings  # noqa: E402
+from graphql import parse, validate  # noqa: E402
+
+from crm.document_cache import DocumentCache  # noqa: E402
+
+OPERATIONS = {
+    "heartbeat": "{ hello }",
+    # as sent by crm/cron_jobs/send_order_reminders.py
+    "RemindableOrders": """
+        query RemindableOrders($orderDate: [DateTime], $first: Int!, $after: String) {
+            allOrders(orderDate: $orderDate, orderBy: "id", first: $first, after: $after) {
+                edges {
+                    node {
+                        id
+                        customer {
+                            email
+                        }
+                    }
+                }
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+            }
+        }
+    """,
+    "report": """
+        query {
+          totalCustomers
+          totalOrders
+          totalRevenue
+        }
+    """,
+}
+
+
+def per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    schema = graphene_settings.SCHEMA.graphql_schema
+    cache = DocumentCache()
+
+    print(f"{'operation':<18}{'uncached us':>14}{'cached us':>12}{'speedup':>10}")
+    for name, query in OPERATIONS.items():
+        uncached = per_call_us(lambda: validate(schema, parse(query)), args.iterations)
+        cache.parse_and_validate(schema, query)
+        cached = per_call_us(lambda: cache.parse_and_validate(schema, query), args.iterations)
+        print(f"{name:<18}{uncached:>14.1f}{cached:>12.1f}{uncached / cached:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
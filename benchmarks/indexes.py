@@ -0,0 +1,99 @@
+# crm/benchmarks/indexes.py
+"""
+EXPLAIN plans and timings for the filtersets' hot lookups, before and after
+the index set declared in ``crm/models.py``.
+
+"Before" drops the declared indexes and puts back the plain FK index the
+original schema had on ``order.customer_id``; "after" restores the declared
+set. The database must be migrated; it is seeded first when empty.
+
+    python -m crm.benchmarks.indexes --customers 100000 --repeat 5
+"""
+import argparse
+import statistics
+import time
+from datetime import timedelta
+
+from crm.benchmarks.dataset import build_dataset  # configures Django
+from django.db import connection, models  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from crm.models import Customer, Order, Product  # noqa: E402
+
+BASELINE_INDEXES = [
+    (Order, models.Index(fields=["customer"], name="bench_order_customer_fk")),
+]
+
+
+def cases():
+    now = timezone.now()
+    customer_id = Customer.objects.order_by("?").values_list("id", flat=True).first()
+    last_week = now - timedelta(days=7)
+    return [
+        ("OrderFilter order_date range",
+         lambda: Order.objects.filter(order_date__gte=last_week, order_date__lte=now)),
+        ("OrderFilter total_amount range",
+         lambda: Order.objects.filter(total_amount__gte=500, total_amount__lte=600)),
+        ("orders of one customer by date",
+         lambda: Order.objects.filter(customer_id=customer_id).order_by("-order_date")),
+        ("allOrders keyset page (order_date, id)",
+         lambda: Order.objects.filter(order_date__gt=last_week).order_by("order_date", "id")[:50]),
+        ("ProductFilter low_stock",
+         lambda: Product.objects.filter(stock__lt=10)),
+        ("ProductFilter stock range",
+         lambda: Product.objects.filter(stock__gte=50, stock__lte=60)),
+        ("CustomerFilter created_at range",
+         lambda: Customer.objects.filter(created_at__gte=now - timedelta(days=30))),
+        ("cleanup: inactive customers",
+         lambda: Customer.objects.filter(created_at__lt=now - timedelta(days=365), order__isnull=True)),
+    ]
+
+
+def declared_indexes():
+    return [(model, index) for model in (Customer, Product, Order) for index in model._meta.indexes]
+
+
+def use_indexes(drop, create):
+    with connection.schema_editor() as editor:
+        for model, index in drop:
+            editor.remove_index(model, index)
+        for model, index in create:
+            editor.add_index(model, index)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def run_cases(repeat):
+    results = []
+    for name, build in cases():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(build())
+            timings.append((time.perf_counter() - start) * 1000)
+        results.append((name, statistics.median(timings), build().explain()))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the filter index set.")
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if not Order.objects.exists():
+        build_dataset(customers=args.customers)
+
+    use_indexes(drop=declared_indexes(), create=BASELINE_INDEXES)
+    before = run_cases(args.repeat)
+    use_indexes(drop=BASELINE_INDEXES, create=declared_indexes())
+    after = run_cases(args.repeat)
+
+    for (name, before_ms, before_plan), (_, after_ms, after_plan) in zip(before, after):
+        print(f"== {name}: {before_ms:.2f} ms -> {after_ms:.2f} ms")
+        print(f"   before: {before_plan}")
+        print(f"   after:  {after_plan}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# crm/benchmarks/stock_stress.py
+"""
+Concurrent createOrder stress test for stock reservation.
+
+Fires ``--orders`` createOrder mutations from ``--threads`` threads at a few
+products with limited stock, then checks that stock never went negative and
+that exactly the quantity of the successful orders was taken out. Prints the
+throughput and exits non-zero if anything was oversold.
+
+    python -m crm.benchmarks.stock_stress --orders 5000 --threads 32
+
+Run it against PostgreSQL: SQLite serializes writers on a database lock, so
+there most calls fail with "database is locked" (counted separately) rather
+than exercising the row-level conditional updates.
+"""
+import argparse
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from crm.benchmarks.dataset import build_dataset  # configures Django
+from django.db import connection  # noqa: E402
+from django.db.models import Sum  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from graphene_django.settings import graphene_settings  # noqa: E402
+
+from crm.models import Customer, OrderItem, Product  # noqa: E402
+
+MUTATION = """
+mutation Checkout($customerId: ID!, $items: [OrderItemInput]) {
+  createOrder(customerId: $customerId, items: $items) { order { id } }
+}
+"""
+
+
+def sold_per_product(product_ids):
+    rows = OrderItem.objects.filter(product_id__in=product_ids).values("product_id").annotate(q=Sum("quantity"))
+    return {row["product_id"]: row["q"] for row in rows}
+
+
+def checkout(schema, customer_id, product_ids, quantity):
+    items = [{"productId": str(product_id), "quantity": quantity} for product_id in product_ids]
+    try:
+        result = schema.execute(
+            MUTATION,
+            variable_values={"customerId": str(customer_id), "items": items},
+            context_value=RequestFactory().post("/graphql"),
+        )
+        if not result.errors:
+            return "ok"
+        message = str(result.errors[0])
+        return "out_of_stock" if "Insufficient stock" in message else message
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress concurrent stock reservation.")
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--products", type=int, default=3)
+    parser.add_argument("--stock", type=int, default=1000)
+    parser.add_argument("--quantity", type=int, default=1)
+    args = parser.parse_args()
+
+    if not Customer.objects.exists():
+        build_dataset(customers=100, orders=0, products=args.products)
+    customer_id = Customer.objects.values_list("id", flat=True).first()
+    products = list(Product.objects.order_by("pk")[:args.products])
+    Product.objects.filter(pk__in=[p.pk for p in products]).update(stock=args.stock)
+    product_ids = [p.pk for p in products]
+    sold_before = sold_per_product(product_ids)
+
+    schema = graphene_settings.SCHEMA
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        outcomes = Counter(pool.map(
+            lambda _: checkout(schema, customer_id, product_ids, args.quantity), range(args.orders)
+        ))
+    elapsed = time.perf_counter() - start
+
+    oversold = False
+    sold_after = sold_per_product(product_ids)
+    for product in Product.objects.filter(pk__in=product_ids).order_by("pk"):
+        sold = sold_after.get(product.pk, 0) - sold_before.get(product.pk, 0)
+        # stock must cover exactly what the successful orders' line items took
+        ok = product.stock >= 0 and product.stock + sold == args.stock == product.stock + outcomes["ok"] * args.quantity
+        oversold |= not ok
+        print(f"product {product.pk}: stock {args.stock} -> {product.stock}, {sold} sold {'OK' if ok else 'MISMATCH'}")
+
+    print(f"{args.orders} calls on {args.threads} threads in {elapsed:.2f}s "
+          f"({args.orders / elapsed:.0f} calls/s, {outcomes['ok'] / elapsed:.0f} orders/s)")
+    for outcome, n in outcomes.most_common():
+        print(f"  {outcome}: {n}")
+    sys.exit(1 if oversold else 0)
+
+
+if __name__ == "__main__":
+    main()
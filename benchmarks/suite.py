@@ -0,0 +1,235 @@
+# crm/benchmarks/suite.py
+"""
+Scale benchmark suite: every root query field, filter and mutation.
+
+For each dataset size a fresh SQLite database is migrated and seeded with
+``crm.benchmarks.dataset``, then each case is executed against the schema
+``--repeat`` times. Recorded per case: p50/p95/p99/mean latency, SQL query
+count and peak Python memory. Results go to a JSON file so two commits can
+be compared:
+
+    python -m crm.benchmarks.suite --sizes 10000 100000 1000000 --out before.json
+    python -m crm.benchmarks.suite --sizes 10000 100000 1000000 --out after.json
+    python -m crm.benchmarks.suite --compare before.json after.json
+
+Mutations run inside a rolled-back transaction so every iteration sees the
+same data. Cases that fail record their errors instead of aborting the run.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from itertools import count
+
+from crm.benchmarks.dataset import build_dataset  # configures Django
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, connections, transaction  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from graphene_django.settings import graphene_settings  # noqa: E402
+
+from crm.models import Customer, Product  # noqa: E402
+
+_unique = count()
+
+QUERIES = {
+    "hello": "{ hello }",
+    "customers": "{ customers { id name email phone } }",
+    "products": "{ products { id name price stock } }",
+    "orders": "{ orders { id totalAmount orderDate customer { name } products { name price } } }",
+    "totals": "{ totalCustomers totalOrders totalRevenue }",
+}
+
+# (field, arguments) -> a connection query fetching the first page
+CONNECTIONS = [
+    ("allCustomers", ""),
+    ("allCustomers", 'name: "Customer 1"'),
+    ("allCustomers", 'email: "customer1"'),
+    ("allCustomers", 'createdAtGte: "2025-01-01"'),
+    ("allCustomers", 'createdAtLte: "2025-01-01"'),
+    ("allCustomers", 'phonePattern: "+1"'),
+    ("allCustomers", 'orderBy: "-created_at"'),
+    ("allProducts", ""),
+    ("allProducts", 'name: "Product 1"'),
+    ("allProducts", "price: [100, 1000]"),
+    ("allProducts", "stock: [0, 50]"),
+    ("allProducts", "lowStock: true"),
+    ("allProducts", 'orderBy: "-stock"'),
+    ("allOrders", ""),
+    ("allOrders", "totalAmount: [500, 1000]"),
+    ('allOrders', 'orderDate: ["2025-01-01T00:00:00", "2025-02-01T00:00:00"]'),
+    ("allOrders", 'customerName: "Customer 1"'),
+    ("allOrders", 'productName: "Product 1"'),
+    ("allOrders", 'productId: "1"'),
+    ("allOrders", 'orderBy: "-total_amount"'),
+]
+
+NODE_FIELDS = {
+    "allCustomers": "id name email createdAt",
+    "allProducts": "id name price stock",
+    "allOrders": "id totalAmount orderDate customer { name } products { edges { node { name } } }",
+}
+
+
+def connection_query(field, arguments):
+    args = f"(first: 50{', ' + arguments if arguments else ''})"
+    return f"{{ {field}{args} {{ edges {{ node {{ {NODE_FIELDS[field]} }} }} pageInfo {{ endCursor }} }} }}"
+
+
+def mutation_cases():
+    customer_id = Customer.objects.values_list("id", flat=True).first()
+    product_ids = list(Product.objects.values_list("id", flat=True)[:3])
+    return {
+        "createCustomer": lambda n: (
+            f'mutation {{ createCustomer(name: "Bench", email: "bench{n}@example.com") {{ customer {{ id }} }} }}'
+        ),
+        "bulkCreateCustomers": lambda n: (
+            "mutation { bulkCreateCustomers(customers: ["
+            + ", ".join(f'{{name: "Bulk", email: "bulk{n}-{i}@example.com"}}' for i in range(100))
+            + "]) { customers { id } errors } }"
+        ),
+        "createProduct": lambda n: (
+            f'mutation {{ createProduct(name: "Bench {n}", price: 9.99, stock: 5) {{ product {{ id }} }} }}'
+        ),
+        "createOrder": lambda n: (
+            f'mutation {{ createOrder(customerId: "{customer_id}", productIds: {json.dumps([str(i) for i in product_ids])}) '
+            "{ order { id totalAmount } } }"
+        ),
+        "updateLowStockProducts": lambda n: (
+            "mutation { updateLowStockProducts { success updatedProducts { name stock } } }"
+        ),
+    }
+
+
+def execute(schema, query, rollback=False):
+    context = RequestFactory().post("/graphql")
+    if not rollback:
+        return schema.execute(query, context_value=context)
+    with transaction.atomic():
+        result = schema.execute(query, context_value=context)
+        transaction.set_rollback(True)
+    return result
+
+
+def measure(schema, name, kind, make_query, repeat, rollback=False):
+    timings, errors = [], []
+    for _ in range(repeat):
+        query = make_query(next(_unique))
+        start = time.perf_counter()
+        result = execute(schema, query, rollback)
+        timings.append((time.perf_counter() - start) * 1000)
+        if result.errors:
+            errors = sorted({str(error) for error in result.errors})
+
+    with CaptureQueriesContext(connection) as queries:
+        tracemalloc.start()
+        execute(schema, make_query(next(_unique)), rollback)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    timings.sort()
+    pick = lambda q: timings[min(len(timings) - 1, int(q * len(timings)))]  # noqa: E731
+    return {
+        "name": name,
+        "kind": kind,
+        "p50_ms": round(pick(0.50), 3),
+        "p95_ms": round(pick(0.95), 3),
+        "p99_ms": round(pick(0.99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "queries": len(queries),
+        "peak_kib": round(peak / 1024, 1),
+        "errors": errors,
+    }
+
+
+def use_database(path):
+    connections.close_all()
+    connection.settings_dict.update(ENGINE="django.db.backends.sqlite3", NAME=path)
+    if os.path.exists(path):
+        os.remove(path)
+    call_command("migrate", verbosity=0)
+
+
+def run_size(size, repeat, workdir):
+    use_database(os.path.join(workdir, f"bench_{size}.sqlite3"))
+    build_dataset(customers=size, orders=size, products=max(100, size // 100), log=lambda msg: None)
+    schema = graphene_settings.SCHEMA
+
+    results = []
+    for name, query in QUERIES.items():
+        results.append(measure(schema, name, "query", lambda n, q=query: q, repeat))
+    for field, arguments in CONNECTIONS:
+        name = f"{field}({arguments})" if arguments else field
+        query = connection_query(field, arguments)
+        results.append(measure(schema, name, "connection", lambda n, q=query: q, repeat))
+    for name, make_query in mutation_cases().items():
+        results.append(measure(schema, name, "mutation", make_query, repeat, rollback=True))
+
+    for result in results:
+        result["size"] = size
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(before_path, after_path):
+    with open(before_path) as f:
+        before = {(r["size"], r["name"]): r for r in json.load(f)["results"]}
+    with open(after_path) as f:
+        after = json.load(f)["results"]
+    print(f"{'size':>8}  {'case':<55}{'p50 before':>12}{'p50 after':>12}{'change':>9}{'queries':>12}")
+    for result in after:
+        old = before.get((result["size"], result["name"]))
+        if old is None:
+            continue
+        change = (result["p50_ms"] / old["p50_ms"] - 1) * 100 if old["p50_ms"] else 0.0
+        print(
+            f"{result['size']:>8}  {result['name']:<55}{old['p50_ms']:>12.2f}{result['p50_ms']:>12.2f}"
+            f"{change:>8.1f}%{old['queries']:>6} ->{result['queries']:>3}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CRM scale benchmark suite.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--workdir", default="/tmp")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = []
+    for size in args.sizes:
+        print(f"size {size} ...", file=sys.stderr)
+        results.extend(run_size(size, args.repeat, args.workdir))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"wrote {len(results)} results to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# crm/cost.py
+"""
+Static query cost and depth analysis.
+
+Runs after validation and before execution, so an operation over budget is
+rejected before any SQL is issued. Costs are estimated from the document
+alone:
+
+* every field has a weight: ``FIELD_WEIGHTS`` / ``GRAPHQL_FIELD_COSTS``
+  overrides, else 1 for object fields and 0 for scalars;
+* a field taking ``first``/``last`` multiplies its subtree by the page size
+  (the relay max limit when neither is given);
+* any other list field multiplies its subtree by ``GRAPHQL_DEFAULT_LIST_SIZE``.
+
+Those defaults are guesses for an unbounded top-level list. Inside a list,
+a per-row relation such as ``Order.products`` is small and is batched by the
+loaders, so only an explicit ``first``/``last`` multiplies there; lists and
+connections without one count once per parent row.
+
+So ``allOrders(first: 50) { edges { node { customer { name } } } }`` costs
+``50 * (1 + 1 + 1 + 1) = 200``, and
+``orders { customer { name } products { name } }`` costs
+``1000 * (1 + 1 + 1) = 3000``.
+"""
+from django.conf import settings
+from graphene_django.settings import graphene_settings
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    IntValueNode,
+    VariableNode,
+    get_named_type,
+    get_nullable_type,
+    get_operation_ast,
+    is_composite_type,
+    is_list_type,
+)
+
+# "Type.field" -> weight, for fields that cost more than a plain lookup
+FIELD_WEIGHTS = {
+    "Mutation.bulkCreateCustomers": 10,
+    "Mutation.upsertCustomers": 10,
+    "Mutation.bulkCreateProducts": 10,
+    "Mutation.bulkCreateOrders": 10,
+    "Mutation.updateLowStockProducts": 10,
+}
+
+
+def get_limits():
+    return {
+        "max_cost": getattr(settings, "GRAPHQL_MAX_QUERY_COST", 10000),
+        "max_depth": getattr(settings, "GRAPHQL_MAX_QUERY_DEPTH", 10),
+        "list_size": getattr(settings, "GRAPHQL_DEFAULT_LIST_SIZE", 1000),
+        "page_size": graphene_settings.RELAY_CONNECTION_MAX_LIMIT or 100,
+    }
+
+
+class QueryCostAnalyzer:
+    def __init__(self, schema, document, variables=None):
+        self.schema = schema
+        # raw request variables: they haven't been coerced yet, so anything
+        # read from them is checked before use
+        self.variables = variables if isinstance(variables, dict) else {}
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if definition.kind == "fragment_definition"
+        }
+        self.weights = {**FIELD_WEIGHTS, **getattr(settings, "GRAPHQL_FIELD_COSTS", {})}
+        self.limits = get_limits()
+        self.max_depth = 0
+
+    def argument(self, field_node, name):
+        for argument in field_node.arguments or ():
+            if argument.name.value != name:
+                continue
+            value = argument.value
+            if isinstance(value, VariableNode):
+                value = self.variables.get(value.name.value)
+                # a mistyped variable fails coercion later; cost it as unset
+                return value if type(value) is int else None
+            if isinstance(value, IntValueNode):
+                return int(value.value)
+        return None
+
+    def multiplier(self, field_def, field_node, parent_type, in_list=False):
+        if "first" in field_def.args or "last" in field_def.args:
+            sizes = [self.argument(field_node, "first"), self.argument(field_node, "last")]
+            sizes = [size for size in sizes if size is not None]
+            if not sizes:
+                return 1 if in_list else self.limits["page_size"]
+            # Int coercion accepts negatives, which would subtract from the
+            # total and let expensive siblings through
+            return max(0, min(min(sizes), self.limits["page_size"]))
+        if is_list_type(get_nullable_type(field_def.type)) and not parent_type.name.endswith("Connection"):
+            return 1 if in_list else self.limits["list_size"]
+        return 1
+
+    def selection_cost(self, selection_set, parent_type, depth, in_list=False):
+        if selection_set is None:
+            return 0
+        self.max_depth = max(self.max_depth, depth)
+        total = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                total += self.field_cost(selection, parent_type, depth, in_list)
+            elif isinstance(selection, InlineFragmentNode):
+                type_ = parent_type
+                if selection.type_condition is not None:
+                    type_ = self.schema.get_type(selection.type_condition.name.value)
+                total += self.selection_cost(selection.selection_set, type_, depth, in_list)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments.get(selection.name.value)
+                if fragment is not None:
+                    type_ = self.schema.get_type(fragment.type_condition.name.value)
+                    total += self.selection_cost(fragment.selection_set, type_, depth, in_list)
+        return total
+
+    def field_cost(self, field_node, parent_type, depth, in_list=False):
+        name = field_node.name.value
+        fields = getattr(parent_type, "fields", {})
+        if name.startswith("__") or name not in fields:
+            return 0
+        field_def = fields[name]
+        named_type = get_named_type(field_def.type)
+        default = 1 if is_composite_type(named_type) else 0
+        weight = self.weights.get(f"{parent_type.name}.{name}", default)
+        multiplier = self.multiplier(field_def, field_node, parent_type, in_list)
+        nested = in_list or multiplier > 1 or is_list_type(get_nullable_type(field_def.type))
+        children = self.selection_cost(field_node.selection_set, named_type, depth + 1, nested)
+        return multiplier * (weight + children)
+
+    def analyze(self, operation):
+        root = self.schema.get_root_type(operation.operation)
+        cost = self.selection_cost(operation.selection_set, root, 1)
+        return {"cost": cost, "depth": self.max_depth}
+
+
+def check_query_cost(schema, document, operation_name=None, variables=None):
+    """
+    Return ``(report, errors)`` for the operation about to run.
+
+    ``report`` goes into the response ``extensions``; ``errors`` is empty
+    unless the operation is over the cost or depth budget.
+    """
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return None, []
+    analyzer = QueryCostAnalyzer(schema, document, variables)
+    report = analyzer.analyze(operation)
+    limits = analyzer.limits
+    report.update(maxCost=limits["max_cost"], maxDepth=limits["max_depth"])
+
+    errors = []
+    if report["depth"] > limits["max_depth"]:
+        errors.append(GraphQLError(
+            f"Query depth {report['depth']} exceeds the maximum of {limits['max_depth']}.",
+            extensions={"code": "QUERY_TOO_DEEP"},
+        ))
+    if report["cost"] > limits["max_cost"]:
+        errors.append(GraphQLError(
+            f"Query cost {report['cost']} exceeds the budget of {limits['max_cost']}.",
+            extensions={"code": "QUERY_TOO_EXPENSIVE"},
+        ))
+    return report, errors
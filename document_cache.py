@@ -0,0 +1,126 @@
+# crm/document_cache.py
+"""
+Parsed and validated document cache, plus automatic persisted queries.
+
+Parsing and validating a document costs far more than executing the
+``{ hello }`` heartbeat it describes, and the same few documents are sent
+over and over. ``DocumentCache`` keeps the parsed AST and its validation
+errors in a bounded LRU keyed by the document's SHA-256, so repeats skip
+straight to execution.
+
+Persisted queries follow the Apollo protocol: clients send
+``extensions.persistedQuery.sha256Hash`` and may omit ``query`` once the
+server has seen it. Query text is stored in Django's cache framework so
+every worker can serve a hash registered by any other. Entries expire after
+``GRAPHQL_PERSISTED_QUERY_TTL`` seconds (a day by default), so one-off
+documents don't pile up; a client whose hash expired gets
+``PersistedQueryNotFound`` and registers it again.
+"""
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from graphql import GraphQLError, parse, validate
+
+PERSISTED_QUERY_PREFIX = "crm:apq:"
+
+
+def get_persisted_query_ttl():
+    return getattr(settings, "GRAPHQL_PERSISTED_QUERY_TTL", 24 * 60 * 60)
+
+
+def document_hash(query):
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class DocumentCache:
+    """Thread-safe LRU of ``hash -> (document, validation_errors)``."""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def parse_and_validate(self, schema, query, rules=None, max_errors=None):
+        """
+        Return ``(document, errors)`` for ``query`` against ``schema``.
+
+        Syntax errors are returned as ``(None, [error])`` and not cached.
+        """
+        key = document_hash(query)
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+        try:
+            document = parse(query)
+        except GraphQLError as error:
+            return None, [error]
+        errors = validate(schema, document, rules, max_errors=max_errors)
+        entry = (document, errors)
+        self.put(key, entry)
+        return entry
+
+
+document_cache = DocumentCache(getattr(settings, "GRAPHQL_DOCUMENT_CACHE_SIZE", 512))
+
+
+class PersistedQueryNotFound(GraphQLError):
+    def __init__(self):
+        super().__init__("PersistedQueryNotFound", extensions={"code": "PERSISTED_QUERY_NOT_FOUND"})
+
+
+def resolve_persisted_query(query, extensions):
+    """
+    Apply automatic persisted queries to an incoming request.
+
+    Returns the query text to execute. Registers ``query`` under its hash
+    when both are sent; raises ``PersistedQueryNotFound`` for an unknown
+    hash so the client retries with the full text.
+    """
+    persisted = (extensions or {}).get("persistedQuery")
+    if not persisted:
+        return query
+
+    sha256 = persisted.get("sha256Hash")
+    if persisted.get("version") != 1 or not sha256:
+        raise GraphQLError("Unsupported persistedQuery version.")
+
+    if query:
+        if document_hash(query) != sha256:
+            raise GraphQLError("provided sha does not match query")
+        cache.set(PERSISTED_QUERY_PREFIX + sha256, query, get_persisted_query_ttl())
+        return query
+
+    query = cache.get(PERSISTED_QUERY_PREFIX + sha256)
+    if query is None:
+        raise PersistedQueryNotFound()
+    return query
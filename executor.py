@@ -0,0 +1,72 @@
+# crm/executor.py
+"""
+Run GraphQL operations from jobs (cron, Celery) without an HTTP round trip.
+
+``run_operation`` is what the bundled jobs call. By default it executes in
+the job's own process through ``CRMGraphQLView``'s pipeline, so it gets the
+same document cache, cost limits, DataLoaders, atomic mutations, response
+cache invalidation and error formatting as a request to ``/graphql``. It
+skips JSON encoding, the socket, the middleware stack and the web worker
+slot. Jobs keep working when the web tier is saturated or down.
+
+Set ``CRM_GRAPHQL_TRANSPORT = "http"`` to go through ``CRM_GRAPHQL_ENDPOINT``
+instead, e.g. when the job runs on a host without database access.
+
+Both transports return the response body as a dict:
+``{"data": ..., "errors": [...], "extensions": ...}``.
+"""
+from django.conf import settings
+from django.http import HttpRequest
+
+TRANSPORTS = ("inprocess", "http")
+
+
+def get_transport():
+    return getattr(settings, "CRM_GRAPHQL_TRANSPORT", "inprocess")
+
+
+def get_endpoint():
+    return getattr(settings, "CRM_GRAPHQL_ENDPOINT", "http://localhost:8000/graphql")
+
+
+def make_request():
+    """A bare POST request to stand in as the operation's context."""
+    request = HttpRequest()
+    request.method = "POST"
+    request.path = request.path_info = "/graphql"
+    return request
+
+
+def execute_in_process(query, variables=None, operation_name=None):
+    # imported here so importing crm.executor doesn't load the schema
+    from .views import CRMGraphQLView
+
+    request = make_request()
+    view = CRMGraphQLView()
+    view.setup(request)
+    data = {"query": query, "variables": variables, "operationName": operation_name}
+    result = view.execute_graphql_request(request, data, query, variables, operation_name)
+    response, _ = view.format_result(result)
+    return response
+
+
+def execute_over_http(query, variables=None, operation_name=None, timeout=10):
+    import requests
+
+    response = requests.post(
+        get_endpoint(),
+        json={"query": query, "variables": variables, "operationName": operation_name},
+        timeout=timeout,
+    )
+    if response.status_code >= 500:
+        response.raise_for_status()
+    return response.json()
+
+
+def run_operation(query, variables=None, operation_name=None, transport=None):
+    transport = transport or get_transport()
+    if transport == "inprocess":
+        return execute_in_process(query, variables, operation_name)
+    if transport == "http":
+        return execute_over_http(query, variables, operation_name)
+    raise ValueError(f"Unknown GraphQL transport {transport!r}; expected one of {TRANSPORTS}.")
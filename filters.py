@@ -38,6 +38,8 @@ class CustomerFilter(django_filters.FilterSet):
     created_at_lte = DateFilter(field_name='created_at', lookup_expr='lte')
     # Challenge: Custom filter for phone pattern
     phone_pattern = django_filters.MethodFilter(method=filter_by_phone_pattern)
+    # orderBy: sortable columns (also the keyset pagination sort key)
+    order_by = django_filters.OrderingFilter(fields=('name', 'email', 'created_at'))
 
     class Meta:
         model = Customer
@@ -58,6 +60,7 @@ class ProductFilter(django_filters.FilterSet):
         return queryset
 
     low_stock = Filter(method='filter_low_stock', label="Filter products with stock less than 10")
+    order_by = django_filters.OrderingFilter(fields=('name', 'price', 'stock'))
 
     class Meta:
         model = Product
@@ -77,6 +80,8 @@ class OrderFilter(django_filters.FilterSet):
     # Challenge: Filter orders that include a specific product ID
     product_id = Filter(field_name='products__id', lookup_expr='exact', distinct=True)
 
+    order_by = django_filters.OrderingFilter(fields=('id', 'order_date', 'total_amount'))
+
     class Meta:
         model = Order
         fields = ['total_amount', 'order_date']
@@ -91,6 +96,8 @@ from graphene_django.filter import DjangoFilterConnectionField
 # Import models and filters
 from .models import Customer, Product, Order
 from .filters import CustomerFilter, ProductFilter, OrderFilter
+from .loaders import OrderConnectionField, load_order_customer, load_order_products
+from .pagination import KeysetConnection, KeysetConnectionField
 from django.db import IntegrityError, transaction
 from django.core.exceptions import ValidationError
 # ... (Imported other items like re, Decimal, etc. from Task 2)
@@ -103,18 +110,28 @@ class CustomerType(DjangoObjectType):
         model = Customer
         fields = ('id', 'name', 'email', 'phone', 'created_at')
         interfaces = (relay.Node,) # Required for connections/pagination
+        connection_class = KeysetConnection
 
 class ProductType(DjangoObjectType):
     class Meta:
         model = Product
         fields = ('id', 'name', 'price', 'stock')
         interfaces = (relay.Node,)
+        connection_class = KeysetConnection
 
 class OrderType(DjangoObjectType):
     class Meta:
         model = Order
         fields = ('id', 'customer', 'products', 'order_date', 'total_amount')
         interfaces = (relay.Node,)
+        connection_class = KeysetConnection
+
+    # Batched per request unless already joined/prefetched, see crm/loaders.py
+    def resolve_customer(self, info):
+        return load_order_customer(self, info)
+
+    def resolve_products(self, info, **kwargs):
+        return load_order_products(self, info)
 
 # --- 2. Define Mutations (Omitted for brevity, assumed from Task 2) ---
 # ... (CreateCustomer, BulkCreateCustomers, CreateProduct, CreateOrder logic goes here)
@@ -133,25 +150,28 @@ class Query(graphene.ObjectType):
 
     # A. Customer Queries
     customer = relay.Node.Field(CustomerType)
-    # Uses DjangoFilterConnectionField for filtering, sorting, and pagination
-    all_customers = DjangoFilterConnectionField(
+    # Filter connection with keyset cursors (crm/pagination.py) for filtering, sorting, and pagination
+    all_customers = KeysetConnectionField(
         CustomerType, 
         filterset_class=CustomerFilter,
-        # Challenge: order_by argument is automatically supported by DjangoFilterConnectionField
+        # Challenge: orderBy comes from CustomerFilter.order_by
     )
 
     # B. Product Queries
     product = relay.Node.Field(ProductType)
-    all_products = DjangoFilterConnectionField(
+    all_products = KeysetConnectionField(
         ProductType, 
         filterset_class=ProductFilter,
     )
 
     # C. Order Queries
     order = relay.Node.Field(OrderType)
-    all_orders = DjangoFilterConnectionField(
+    # Keyset-paginated on (order_date, id) unless orderBy says otherwise;
+    # primes the customer/products loaders with each page
+    all_orders = OrderConnectionField(
         OrderType, 
         filterset_class=OrderFilter,
+        default_order=('order_date',),
     )
 
 # Note: The top-level schema (alx_backend_graphql_crm/schema.py) should already be correctly
@@ -24,16 +24,27 @@ class Order(models.Model):
     order_date = models.DateTimeField(default=timezone.now)
 
 
-python manage.py makemigrations
+# the schema changes ship in crm/migrations; 0002 moves the old
+# order_products links into OrderItem, so run migrate, not makemigrations
 python manage.py migrate
+# 0004 backfills Customer.email_normalized; this lists the case/whitespace
+# duplicates it had to leave NULL, re-run it after merging them
+python manage.py normalize_customer_emails
 
 
 import graphene
 from graphene_django import DjangoObjectType
 from graphql import GraphQLError
-from django.db import transaction
+from django.db import DataError, IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower, Trim
 from django.utils import timezone
-from .models import Customer, Product, Order
+from .models import Customer, Product, Order, OrderItem, normalize_email
+from .loaders import load_order_customer, load_order_products, prime_order_loaders
+from .optimizer import optimize_queryset
+from .stats import adjust_stats, get_request_stats
+from .inventory import OutOfStock, reserve_stock
+from .rollups import sales_summary
 
 # ----------------------------
 # GraphQL Types
@@ -49,10 +60,22 @@ class ProductType(DjangoObjectType):
         model = Product
         fields = ("id", "name", "price", "stock")
 
+class OrderItemType(DjangoObjectType):
+    class Meta:
+        model = OrderItem
+        fields = ("id", "product", "quantity", "unit_price")
+
 class OrderType(DjangoObjectType):
     class Meta:
         model = Order
-        fields = ("id", "customer", "products", "total_amount", "order_date")
+        fields = ("id", "customer", "products", "items", "total_amount", "order_date")
+
+    # Batched per request unless already joined/prefetched, see crm/loaders.py
+    def resolve_customer(self, info):
+        return load_order_customer(self, info)
+
+    def resolve_products(self, info):
+        return load_order_products(self, info)
 
 # ----------------------------
 # Validation helpers
@@ -60,11 +83,23 @@ class OrderType(DjangoObjectType):
 
 import re
 
+PHONE_RE = re.compile(r"^\+?\d[\d\-]{5,}$")
+
 def validate_phone(phone):
     if phone is None:
         return True
-    pattern = r"^\+?\d[\d\-]{5,}$"
-    return re.match(pattern, phone) is not None
+    return PHONE_RE.match(phone) is not None
+
+def customer_error(name, email, phone):
+    """Why a bulk customer row can't be stored, or None; checks the column limits too."""
+    if len(name) > Customer._meta.get_field("name").max_length:
+        return f"Invalid name: {name[:50]}..."
+    if len(email) > Customer._meta.get_field("email").max_length:
+        return f"Invalid email: {email[:50]}..."
+    phone_length = Customer._meta.get_field("phone").max_length
+    if not validate_phone(phone) or (phone and len(phone) > phone_length):
+        return f"Invalid phone: {phone}"
+    return None
 
 # ----------------------------
 # CreateCustomer Mutation
@@ -80,14 +115,15 @@ class CreateCustomer(graphene.Mutation):
     message = graphene.String()
 
     def mutate(self, info, name, email, phone=None):
-        # Email uniqueness check
-        if Customer.objects.filter(email=email).exists():
-            raise GraphQLError("Email already exists.")
-
         if not validate_phone(phone):
             raise GraphQLError("Invalid phone format.")
 
-        customer = Customer.objects.create(name=name, email=email, phone=phone)
+        # Email uniqueness (case-insensitive) is enforced by the unique index
+        try:
+            with transaction.atomic():
+                customer = Customer.objects.create(name=name, email=email, phone=phone)
+        except IntegrityError:
+            raise GraphQLError("Email already exists.")
         return CreateCustomer(
             customer=customer,
             message="Customer created successfully."
@@ -102,39 +138,216 @@ class BulkCustomerInput(graphene.InputObjectType):
     email = graphene.String(required=True)
     phone = graphene.String(required=False)
 
+def adopt_legacy_customers(keys):
+    """
+    Fill ``email_normalized`` on rows saved before it existed whose email
+    normalizes to one of ``keys``, so the duplicate checks see them.
+    Case-variant duplicates can't share the key and are left NULL.
+    """
+    normalized = Lower(Trim("email"))
+    legacy = Customer.objects.filter(email_normalized__isnull=True).alias(key=normalized)
+    if not legacy.filter(key__in=keys).exists():
+        return
+    try:
+        with transaction.atomic():
+            legacy.filter(key__in=keys).update(email_normalized=normalized)
+    except IntegrityError:
+        # two legacy rows share a key: adopt the others one key at a time
+        for key in set(legacy.filter(key__in=keys).annotate(k=normalized).values_list("k", flat=True)):
+            try:
+                with transaction.atomic():
+                    legacy.filter(key=key).update(email_normalized=normalized)
+            except IntegrityError:
+                pass
+
+def taken_emails(rows):
+    """``email_normalized`` of ``rows`` that already exist, by either unique column."""
+    existing = Customer.objects.filter(
+        Q(email_normalized__in=[r.email_normalized for r in rows]) | Q(email__in=[r.email for r in rows])
+    ).values_list("email", "email_normalized")
+    return {normalized or normalize_email(email) for email, normalized in existing}
+
+def insert_customers(rows):
+    """
+    bulk_create ``rows`` in one transaction; returns ``(created, errors)``.
+
+    If a concurrent writer took one of the emails since we checked, the
+    chunk is retried without the rows that now clash. A row the database
+    still rejects as invalid (DataError) sends the chunk row by row, so
+    only that row is reported.
+    """
+    try:
+        with transaction.atomic():
+            created = Customer.objects.bulk_create(rows)
+            adjust_stats(customers=len(created))
+        return created, []
+    except DataError:
+        if len(rows) == 1:
+            return [], [f"Invalid customer: {rows[0].email}"]
+        created, errors = [], []
+        for row in rows:
+            row_created, row_errors = insert_customers([row])
+            created.extend(row_created)
+            errors.extend(row_errors)
+        return created, errors
+    except IntegrityError:
+        taken = {r.email_normalized for r in rows} & taken_emails(rows)
+        if not taken:
+            raise
+        created, errors = insert_customers([r for r in rows if r.email_normalized not in taken])
+        return created, [f"Duplicate email: {email}" for email in sorted(taken)] + errors
+
 class BulkCreateCustomers(graphene.Mutation):
     class Arguments:
         customers = graphene.List(BulkCustomerInput, required=True)
+        chunk_size = graphene.Int(required=False, default_value=1000)
 
     customers = graphene.List(CustomerType)
     errors = graphene.List(graphene.String)
 
-    @transaction.atomic
-    def mutate(self, info, customers):
-        created = []
-        errors = []
+    def mutate(self, info, customers, chunk_size=1000):
+        if chunk_size < 1:
+            raise GraphQLError("chunkSize must be positive.")
 
+        keys = {normalize_email(c.email) for c in customers}
+        adopt_legacy_customers(keys)
+        # One query for every email that already exists
+        existing = set(
+            Customer.objects.filter(email_normalized__in=keys)
+            .values_list("email_normalized", flat=True)
+        )
+
+        rows = []
+        errors = []
         for c in customers:
-            try:
-                if Customer.objects.filter(email=c.email).exists():
-                    errors.append(f"Duplicate email: {c.email}")
-                    continue
+            key = normalize_email(c.email)
+            if key in existing:
+                errors.append(f"Duplicate email: {c.email}")
+                continue
+            error = customer_error(c.name, c.email, c.phone)
+            if error:
+                errors.append(error)
+                continue
+            existing.add(key)  # dedupe within the batch
+            rows.append(Customer(name=c.name, email=c.email, email_normalized=key, phone=c.phone))
+
+        # Each chunk commits on its own so a big import never holds one long transaction
+        created = []
+        for start in range(0, len(rows), chunk_size):
+            chunk_created, chunk_errors = insert_customers(rows[start:start + chunk_size])
+            created.extend(chunk_created)
+            errors.extend(chunk_errors)
+
+        return BulkCreateCustomers(customers=created, errors=errors)
+
+# ----------------------------
+# UpsertCustomers Mutation
+# ----------------------------
 
-                if not validate_phone(c.phone):
-                    errors.append(f"Invalid phone: {c.phone}")
-                    continue
+UPSERT_FIELDS = ("name", "email", "phone")
+
+def _upsert_returning(rows):
+    """One INSERT ... ON CONFLICT DO UPDATE; counts its inserts with ``xmax = 0``."""
+    meta = Customer._meta
+    quote = connection.ops.quote_name
+    fields = [meta.get_field(name) for name in ("name", "email", "email_normalized", "phone", "created_at")]
+    columns = ", ".join(quote(field.column) for field in fields)
+    placeholders = ", ".join(["(" + ", ".join(["%s"] * len(fields)) + ")"] * len(rows))
+    updates = ", ".join(
+        f"{quote(column)} = EXCLUDED.{quote(column)}"
+        for column in (meta.get_field(name).column for name in UPSERT_FIELDS)
+    )
+    now = timezone.now()
+    params = [
+        field.get_db_prep_value(now if field.name == "created_at" else getattr(row, field.attname), connection)
+        for row in rows
+        for field in fields
+    ]
+    sql = (
+        f"INSERT INTO {quote(meta.db_table)} ({columns}) VALUES {placeholders} "
+        f"ON CONFLICT ({quote(meta.get_field('email_normalized').column)}) DO UPDATE SET {updates} "
+        f"RETURNING (xmax = 0)"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return sum(1 for inserted, in cursor.fetchall() if inserted)
+
+def _upsert_locked(rows):
+    # the no-op UPDATE counts the rows that exist and locks them (the whole
+    # database on SQLite) until the upsert below commits
+    existing = Customer.objects.filter(email_normalized__in=[r.email_normalized for r in rows]).update(
+        email_normalized=F("email_normalized")
+    )
+    Customer.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["email_normalized"],
+        update_fields=list(UPSERT_FIELDS),
+    )
+    return len(rows) - existing
+
+def upsert_customers(rows):
+    """
+    Insert or update ``rows`` on ``email_normalized``; returns ``(created, errors)``.
+
+    One INSERT ... ON CONFLICT DO UPDATE per call. On PostgreSQL the
+    statement itself reports which rows it inserted; elsewhere the existing
+    rows are counted under lock first. Either way totalCustomers stays
+    exact under concurrent upserts. A row whose exact email belongs to an
+    un-normalized duplicate can't be matched on the key and is reported.
+    """
+    adopt_legacy_customers([r.email_normalized for r in rows])
+    legacy = set(
+        Customer.objects.filter(email_normalized__isnull=True, email__in=[r.email for r in rows])
+        .values_list("email", flat=True)
+    )
+    errors = [f"Duplicate customers for {email}: merge them first." for email in sorted(legacy)]
+    rows = [r for r in rows if r.email not in legacy]
+    if not rows:
+        return 0, errors
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            created = _upsert_returning(rows)
+        else:
+            created = _upsert_locked(rows)
+        adjust_stats(customers=created)
+    return created, errors
+
+class UpsertCustomers(graphene.Mutation):
+    class Arguments:
+        customers = graphene.List(BulkCustomerInput, required=True)
+        chunk_size = graphene.Int(required=False, default_value=1000)
 
-                customer = Customer.objects.create(
-                    name=c.name,
-                    email=c.email,
-                    phone=c.phone
-                )
-                created.append(customer)
+    created = graphene.Int()
+    updated = graphene.Int()
+    errors = graphene.List(graphene.String)
 
-            except Exception as e:
-                errors.append(str(e))
+    def mutate(self, info, customers, chunk_size=1000):
+        if chunk_size < 1:
+            raise GraphQLError("chunkSize must be positive.")
 
-        return BulkCreateCustomers(customers=created, errors=errors)
+        # Last record wins for an email given more than once; a single
+        # upsert statement can't touch the same row twice
+        rows = {}
+        errors = []
+        for c in customers:
+            error = customer_error(c.name, c.email, c.phone)
+            if error:
+                errors.append(error)
+                continue
+            key = normalize_email(c.email)
+            rows[key] = Customer(name=c.name, email=c.email, email_normalized=key, phone=c.phone)
+        rows = list(rows.values())
+
+        created = updated = 0
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            chunk_created, chunk_errors = upsert_customers(chunk)
+            created += chunk_created
+            updated += len(chunk) - len(chunk_errors) - chunk_created
+            errors.extend(chunk_errors)
+
+        return UpsertCustomers(created=created, updated=updated, errors=errors)
 
 # ----------------------------
 # CreateProduct Mutation
@@ -157,42 +370,212 @@ class CreateProduct(graphene.Mutation):
         product = Product.objects.create(name=name, price=price, stock=stock)
         return CreateProduct(product=product)
 
+# ----------------------------
+# BulkCreateProducts Mutation
+# ----------------------------
+
+class BulkProductInput(graphene.InputObjectType):
+    name = graphene.String(required=True)
+    price = graphene.Float(required=True)
+    stock = graphene.Int(required=False, default_value=0)
+
+class BulkCreateProducts(graphene.Mutation):
+    class Arguments:
+        products = graphene.List(BulkProductInput, required=True)
+        chunk_size = graphene.Int(required=False, default_value=1000)
+
+    products = graphene.List(ProductType)
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, products, chunk_size=1000):
+        if chunk_size < 1:
+            raise GraphQLError("chunkSize must be positive.")
+
+        rows = []
+        errors = []
+        for index, p in enumerate(products):
+            stock = p.stock or 0
+            if p.price <= 0:
+                errors.append(f"Product {index}: Price must be positive.")
+            elif stock < 0:
+                errors.append(f"Product {index}: Stock cannot be negative.")
+            else:
+                rows.append(Product(name=p.name, price=p.price, stock=stock))
+
+        created = []
+        for start in range(0, len(rows), chunk_size):
+            with transaction.atomic():
+                created.extend(Product.objects.bulk_create(rows[start:start + chunk_size]))
+
+        return BulkCreateProducts(products=created, errors=errors)
+
 # ----------------------------
 # CreateOrder Mutation
 # ----------------------------
 
+class OrderItemInput(graphene.InputObjectType):
+    product_id = graphene.ID(required=True)
+    quantity = graphene.Int(required=False, default_value=1)
+
+def collect_quantities(product_ids, items):
+    """{product_id: quantity}; productIds entries count as quantity 1 each."""
+    quantities = {}
+    for product_id in product_ids or []:
+        quantities[int(product_id)] = quantities.get(int(product_id), 0) + 1
+    for item in items or []:
+        if item.quantity is None or item.quantity < 1:
+            raise GraphQLError("Quantity must be at least 1.")
+        quantities[int(item.product_id)] = quantities.get(int(item.product_id), 0) + item.quantity
+    return quantities
+
 class CreateOrder(graphene.Mutation):
     class Arguments:
         customer_id = graphene.ID(required=True)
-        product_ids = graphene.List(graphene.ID, required=True)
+        product_ids = graphene.List(graphene.ID, required=False)
+        items = graphene.List(OrderItemInput, required=False)
         order_date = graphene.DateTime(required=False)
 
     order = graphene.Field(OrderType)
 
-    def mutate(self, info, customer_id, product_ids, order_date=None):
-        try:
-            customer = Customer.objects.get(id=customer_id)
-        except Customer.DoesNotExist:
+    @transaction.atomic
+    def mutate(self, info, customer_id, product_ids=None, items=None, order_date=None):
+        if not Customer.objects.filter(id=customer_id).exists():
             raise GraphQLError("Invalid customer ID.")
 
-        if not product_ids:
+        quantities = collect_quantities(product_ids, items)
+        if not quantities:
             raise GraphQLError("At least one product must be selected.")
 
-        products = Product.objects.filter(id__in=product_ids)
-        if products.count() != len(product_ids):
+        prices = dict(Product.objects.filter(id__in=quantities).values_list("id", "price"))
+        if len(prices) != len(quantities):
             raise GraphQLError("One or more product IDs are invalid.")
 
-        total_amount = sum([p.price for p in products])
+        # Conditional decrements; any shortfall rolls the whole order back
+        try:
+            reserve_stock(quantities)
+        except OutOfStock as e:
+            raise GraphQLError(str(e))
 
         order = Order.objects.create(
-            customer=customer,
-            total_amount=total_amount,
+            customer_id=customer_id,
             order_date=order_date or timezone.now(),
         )
-
-        order.products.set(products)
+        # Snapshot the current price on each line; the total is summed in SQL
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product_id=product_id, quantity=quantity, unit_price=prices[product_id])
+            for product_id, quantity in quantities.items()
+        ])
+        Order.objects.filter(pk=order.pk).update_totals()
+        order.refresh_from_db(fields=["total_amount"])
+        # the post_save signal counted the order at total 0
+        adjust_stats(revenue=order.total_amount)
         return CreateOrder(order=order)
 
+# ----------------------------
+# BulkCreateOrders Mutation
+# ----------------------------
+
+class BulkOrderInput(graphene.InputObjectType):
+    customer_id = graphene.ID(required=True)
+    product_ids = graphene.List(graphene.ID, required=False)
+    items = graphene.List(OrderItemInput, required=False)
+    order_date = graphene.DateTime(required=False)
+
+def insert_orders(pending):
+    """
+    Insert ``[(index, Order, {product_id: (quantity, price)}), ...]`` with one
+    INSERT for the orders, one for all line items and one UPDATE for their
+    totals; returns ``(orders, errors)``.
+
+    The chunk's products are locked and its summed quantities reserved in
+    the same transaction. Orders that don't fit the remaining stock (taken
+    in input order) are left out and reported.
+    """
+    with transaction.atomic():
+        # locked in id order, like reserve_stock, so this can't deadlock with createOrder
+        stock = dict(
+            Product.objects.filter(pk__in={pid for _, _, lines in pending for pid in lines})
+            .order_by("pk").select_for_update().values_list("id", "stock")
+        )
+        accepted, errors, needed = [], [], {}
+        for index, order, lines in pending:
+            short = next((pid for pid, (quantity, _) in sorted(lines.items()) if stock.get(pid, 0) < quantity), None)
+            if short is not None:
+                errors.append(f"Order {index}: {OutOfStock(short)}")
+                continue
+            for pid, (quantity, _) in lines.items():
+                stock[pid] -= quantity
+                needed[pid] = needed.get(pid, 0) + quantity
+            accepted.append((order, lines))
+        if not accepted:
+            return [], errors
+        reserve_stock(needed)
+
+        pending = accepted
+        orders = Order.objects.bulk_create([order for order, _ in pending])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product_id=product_id, quantity=quantity, unit_price=price)
+            for order, (_, lines) in zip(orders, pending)
+            for product_id, (quantity, price) in lines.items()
+        ])
+        created = Order.objects.filter(pk__in=[order.pk for order in orders])
+        created.update_totals()
+        orders = list(created.order_by("pk"))
+        adjust_stats(orders=len(orders), revenue=sum(order.total_amount for order in orders))
+    return orders, errors
+
+class BulkCreateOrders(graphene.Mutation):
+    class Arguments:
+        orders = graphene.List(BulkOrderInput, required=True)
+        chunk_size = graphene.Int(required=False, default_value=1000)
+
+    orders = graphene.List(OrderType)
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, orders, chunk_size=1000):
+        if chunk_size < 1:
+            raise GraphQLError("chunkSize must be positive.")
+
+        errors = []
+        parsed = []
+        for index, o in enumerate(orders):
+            try:
+                quantities = collect_quantities(o.product_ids, o.items)
+                if not quantities:
+                    raise GraphQLError("At least one product must be selected.")
+                parsed.append((index, o, int(o.customer_id), quantities))
+            except (GraphQLError, ValueError) as e:
+                errors.append(f"Order {index}: {e}")
+
+        # One query each for every referenced customer and product
+        customer_ids = set(
+            Customer.objects.filter(id__in={customer_id for _, _, customer_id, _ in parsed})
+            .values_list("id", flat=True)
+        )
+        prices = dict(
+            Product.objects.filter(id__in={pid for *_, quantities in parsed for pid in quantities})
+            .values_list("id", "price")
+        )
+
+        pending = []
+        for index, o, customer_id, quantities in parsed:
+            if customer_id not in customer_ids:
+                errors.append(f"Order {index}: Invalid customer ID.")
+            elif any(product_id not in prices for product_id in quantities):
+                errors.append(f"Order {index}: One or more product IDs are invalid.")
+            else:
+                order = Order(customer_id=customer_id, order_date=o.order_date or timezone.now())
+                lines = {pid: (quantity, prices[pid]) for pid, quantity in quantities.items()}
+                pending.append((index, order, lines))
+
+        created = []
+        for start in range(0, len(pending), chunk_size):
+            chunk_created, chunk_errors = insert_orders(pending[start:start + chunk_size])
+            created.extend(chunk_created)
+            errors.extend(chunk_errors)
+
+        return BulkCreateOrders(orders=created, errors=errors)
+
 # ----------------------------
 # Mutation Root
 # ----------------------------
@@ -200,8 +583,26 @@ class CreateOrder(graphene.Mutation):
 class Mutation(graphene.ObjectType):
     create_customer = CreateCustomer.Field()
     bulk_create_customers = BulkCreateCustomers.Field()
+    upsert_customers = UpsertCustomers.Field()
     create_product = CreateProduct.Field()
+    bulk_create_products = BulkCreateProducts.Field()
     create_order = CreateOrder.Field()
+    bulk_create_orders = BulkCreateOrders.Field()
+
+# ----------------------------
+# Sales summary
+# ----------------------------
+
+class Granularity(graphene.Enum):
+    DAY = "DAY"
+    WEEK = "WEEK"
+    MONTH = "MONTH"
+
+class SalesBucket(graphene.ObjectType):
+    period = graphene.Date(description="First day of the bucket")
+    orders = graphene.Int()
+    quantity = graphene.Int(description="Units sold; only with productId")
+    revenue = graphene.Decimal()
 
 # ----------------------------
 # Query Root
@@ -212,14 +613,48 @@ class Query(graphene.ObjectType):
     products = graphene.List(ProductType)
     orders = graphene.List(OrderType)
 
+    # O(1) totals, maintained by crm/stats.py
+    total_customers = graphene.Int()
+    total_orders = graphene.Int()
+    total_revenue = graphene.Decimal()
+
+    # Served from the daily rollups (crm/rollups.py), kept current by
+    # crm.tasks.update_crm_rollups
+    sales_summary = graphene.List(
+        SalesBucket,
+        from_=graphene.Date(required=True, name="from"),
+        to=graphene.Date(required=True),
+        granularity=Granularity(default_value=Granularity.DAY.value),
+        customer_id=graphene.ID(),
+        product_id=graphene.ID(),
+    )
+
     def resolve_customers(self, info):
-        return Customer.objects.all()
+        return optimize_queryset(Customer.objects.all(), info)
 
     def resolve_products(self, info):
-        return Product.objects.all()
+        return optimize_queryset(Product.objects.all(), info)
 
     def resolve_orders(self, info):
-        return Order.objects.all()
+        orders = list(optimize_queryset(Order.objects.all(), info))
+        return prime_order_loaders(info.context, orders)
+
+    def resolve_total_customers(self, info):
+        return get_request_stats(info.context)["total_customers"]
+
+    def resolve_total_orders(self, info):
+        return get_request_stats(info.context)["total_orders"]
+
+    def resolve_total_revenue(self, info):
+        return get_request_stats(info.context)["total_revenue"]
+
+    def resolve_sales_summary(self, info, from_, to, granularity="DAY", customer_id=None, product_id=None):
+        if from_ > to:
+            raise GraphQLError("'from' must not be after 'to'.")
+        # graphene may hand us the enum member rather than its value
+        granularity = getattr(granularity, "value", granularity)
+        buckets = sales_summary(from_, to, granularity, customer_id, product_id)
+        return [SalesBucket(**bucket) for bucket in buckets]
 
 import graphene
 from crm.schema import Query as CRMQuery, Mutation as CRMMutation
@@ -254,6 +689,26 @@ mutation {
   }
 }
 
+query {
+  salesSummary(from: "2025-01-01", to: "2025-12-31", granularity: MONTH, productId: "1") {
+    period
+    orders
+    quantity
+    revenue
+  }
+}
+
+mutation {
+  upsertCustomers(customers: [
+    {name:"Bob Smith", email:"BOB@example.com", phone:"123-456-7890"},
+    {name:"Dave", email:"dave@example.com"}
+  ]) {
+    created
+    updated
+    errors
+  }
+}
+
 mutation {
   createProduct(name:"Laptop", price:999.99, stock:10) {
     product {
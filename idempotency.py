@@ -0,0 +1,148 @@
+# crm/idempotency.py
+"""
+Idempotency keys for GraphQL requests.
+
+A client that may retry (``RequestsHTTPTransport(retries=3)``, the cron and
+Celery jobs) sends an ``Idempotency-Key`` header, or an ``idempotencyKey``
+request parameter next to ``query``/``variables``. The first request with a
+key runs normally and its response is stored; retries with the same key and
+the same payload get that stored response back without executing again.
+
+* a retry that arrives while the first request is still running gets 409;
+* reusing a key for a different payload gets 422.
+
+In a batch each entry is keyed on its own: an entry's ``idempotencyKey``
+is used as given, and the header key gets the entry's position appended.
+
+Entries live in the ``idempotency`` cache alias when it is configured (else
+``default``): the backend bounds the store (``MAX_ENTRIES`` / maxmemory) and
+expires entries after ``GRAPHQL_IDEMPOTENCY_TTL`` seconds on its own. The
+store must be shared by every worker; a process-local one (locmem) only
+dedupes retries that land on the same process, so the ``crm.W001`` system
+check warns about it.
+
+The in-progress marker lasts ``GRAPHQL_IDEMPOTENCY_LOCK_TIMEOUT`` seconds
+and is refreshed while the request runs, so a slow request keeps its claim
+however long it takes and a crashed worker's claim lapses soon after.
+"""
+import hashlib
+import json
+from contextlib import contextmanager
+from threading import Event, Thread
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from django.core.cache.backends.locmem import LocMemCache
+
+KEY_PREFIX = "crm:idem:"
+HEADER = "HTTP_IDEMPOTENCY_KEY"
+PARAM = "idempotencyKey"
+MAX_KEY_LENGTH = 255
+IN_PROGRESS = "__in_progress__"
+
+
+class IdempotencyError(Exception):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def get_store():
+    try:
+        return caches["idempotency"]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def get_ttl():
+    return getattr(settings, "GRAPHQL_IDEMPOTENCY_TTL", 24 * 60 * 60)
+
+
+def get_lock_timeout():
+    return getattr(settings, "GRAPHQL_IDEMPOTENCY_LOCK_TIMEOUT", 60)
+
+
+def check_store(app_configs, **kwargs):
+    if not isinstance(get_store(), LocMemCache):
+        return []
+    return [checks.Warning(
+        "The idempotency store is a per-process LocMemCache.",
+        hint="Retries that reach another worker run again; point the \"idempotency\" "
+             "cache alias at a shared backend such as Redis.",
+        id="crm.W001",
+    )]
+
+
+def fingerprint(query, variables, operation_name):
+    payload = json.dumps([query, variables, operation_name], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_idempotency_key(request, data, index=None):
+    """``index`` is the entry's position when ``data`` is part of a batch."""
+    key = (data or {}).get(PARAM)
+    if key is None:
+        key = request.META.get(HEADER) or request.GET.get(PARAM)
+        if key is None:
+            return None
+        if index is not None:
+            key = f"{key}#{index}"
+    key = str(key)
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise IdempotencyError(f"Idempotency key must be 1-{MAX_KEY_LENGTH} characters.", 400)
+    return key
+
+
+def _cache_key(key):
+    return KEY_PREFIX + hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def begin(key, digest):
+    """
+    Claim ``key`` for this request.
+
+    Returns ``None`` when the caller should execute, or the stored
+    ``(body, status)`` to replay.
+    """
+    store = get_store()
+    cache_key = _cache_key(key)
+    # the in-progress marker expires quickly unless held(), so a crashed worker can't wedge a key
+    if store.add(cache_key, (IN_PROGRESS, digest, None, None), get_lock_timeout()):
+        return None
+    state, stored_digest, body, status = store.get(cache_key, (IN_PROGRESS, digest, None, None))
+    if stored_digest != digest:
+        raise IdempotencyError("Idempotency key was already used with a different request.", 422)
+    if state == IN_PROGRESS:
+        raise IdempotencyError("A request with this idempotency key is still in progress.", 409)
+    return body, status
+
+
+@contextmanager
+def held(key):
+    """Keep ``key``'s in-progress marker from expiring while the block runs."""
+    timeout = get_lock_timeout()
+    stop = Event()
+
+    def refresh():
+        while not stop.wait(timeout / 3):
+            get_store().touch(_cache_key(key), timeout)
+
+    thread = Thread(target=refresh, name="idempotency-refresh", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        # stopped before complete() so a refresh can't shorten the stored response's TTL
+        stop.set()
+        thread.join()
+
+
+def complete(key, digest, body, status):
+    get_store().set(_cache_key(key), ("done", digest, body, status), get_ttl())
+
+
+def release(key):
+    """Forget a claim whose request failed before producing a response."""
+    get_store().delete(_cache_key(key))
@@ -0,0 +1,101 @@
+# crm/inventory.py
+"""
+Stock updates that never read-modify-write in Python.
+
+Every change is a single ``UPDATE ... SET stock = stock + n WHERE ...`` so
+concurrent orders and restocks can't overwrite each other's writes.
+"""
+import sqlite3
+
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import Product
+
+RESTOCK_BATCH_SIZE = 1000
+
+
+class OutOfStock(Exception):
+    def __init__(self, product_id):
+        super().__init__(f"Insufficient stock for product {product_id}.")
+        self.product_id = product_id
+
+
+def reserve_stock(quantities):
+    """
+    Take ``{product_id: quantity}`` out of stock, all or nothing.
+
+    Each line is ``UPDATE ... SET stock = stock - qty WHERE id = %s AND
+    stock >= qty``; a line that matches no row raises ``OutOfStock`` and
+    the surrounding transaction rolls the earlier lines back. Products are
+    locked in id order so concurrent orders can't deadlock each other.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        raise RuntimeError("reserve_stock() must run inside a transaction.")
+    for product_id, quantity in sorted(quantities.items()):
+        reserved = Product.objects.filter(pk=product_id, stock__gte=quantity).update(
+            stock=F("stock") - quantity
+        )
+        if not reserved:
+            raise OutOfStock(product_id)
+
+
+def supports_update_returning():
+    if connection.vendor == "postgresql":
+        return True
+    return connection.vendor == "sqlite" and sqlite3.sqlite_version_info >= (3, 35)
+
+
+def count_low_stock(threshold):
+    return Product.objects.filter(stock__lt=threshold).count()
+
+
+def restock_low_stock(threshold=10, increment=10, batch_size=RESTOCK_BATCH_SIZE):
+    """
+    Add ``increment`` to every product with ``stock < threshold``.
+
+    Returns ``[(id, name, new_stock), ...]`` for the rows changed. Uses one
+    ``UPDATE ... RETURNING`` where the backend has it, otherwise batches of
+    conditional UPDATEs walked in primary-key order.
+    """
+    if supports_update_returning():
+        return _restock_returning(threshold, increment)
+    return _restock_batched(threshold, increment, batch_size)
+
+
+def _restock_returning(threshold, increment):
+    meta = Product._meta
+    quote = connection.ops.quote_name
+    table = quote(meta.db_table)
+    pk = quote(meta.pk.column)
+    name = quote(meta.get_field("name").column)
+    stock = quote(meta.get_field("stock").column)
+    sql = (
+        f"UPDATE {table} SET {stock} = {stock} + %s WHERE {stock} < %s "
+        f"RETURNING {pk}, {name}, {stock}"
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, [increment, threshold])
+        return sorted(cursor.fetchall())
+
+
+def _restock_batched(threshold, increment, batch_size):
+    updated = []
+    last_pk = 0
+    while True:
+        ids = list(
+            Product.objects.filter(stock__lt=threshold, pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return updated
+        last_pk = ids[-1]
+        with transaction.atomic():
+            # the condition is re-checked by the UPDATE itself
+            changed = Product.objects.filter(pk__in=ids, stock__lt=threshold)
+            changed_ids = list(changed.select_for_update().values_list("pk", flat=True))
+            Product.objects.filter(pk__in=changed_ids).update(stock=F("stock") + increment)
+            updated.extend(
+                Product.objects.filter(pk__in=changed_ids).order_by("pk").values_list("pk", "name", "stock")
+            )
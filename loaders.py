@@ -0,0 +1,140 @@
+# crm/loaders.py
+"""
+Per-request DataLoaders for the Order relations.
+
+The list resolvers prime the loaders with every order they return, so the
+first ``OrderType.customer`` / ``OrderType.products`` lookup fetches the
+relation for *all* of those orders in one ``IN (...)`` query. Loaders live on
+``info.context`` (the Django request), so nothing leaks between requests.
+"""
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from .models import Customer, Order
+from .pagination import KeysetConnectionField
+
+
+class DataLoader(ABC):
+    """
+    Minimal synchronous DataLoader.
+
+    Keys queued with ``prime`` are loaded together by the first ``load`` call
+    that misses the cache, using a single ``batch_load`` call.
+    """
+
+    def __init__(self):
+        self._cache = {}
+        self._pending = set()
+
+    @abstractmethod
+    def batch_load(self, keys):
+        """Return a dict mapping each key to its value."""
+
+    def default(self, key):
+        return None
+
+    def prime(self, keys):
+        self._pending.update(key for key in keys if key not in self._cache)
+
+    def load(self, key):
+        if key not in self._cache:
+            self._pending.add(key)
+            keys = list(self._pending)
+            self._pending.clear()
+            results = self.batch_load(keys)
+            for k in keys:
+                self._cache[k] = results.get(k, self.default(k))
+        return self._cache[key]
+
+
+class CustomerLoader(DataLoader):
+    """customer_id -> Customer"""
+
+    def batch_load(self, keys):
+        return Customer.objects.in_bulk(keys)
+
+
+class OrderProductsLoader(DataLoader):
+    """order_id -> [Product, ...]"""
+
+    def default(self, key):
+        return []
+
+    def batch_load(self, keys):
+        through = Order.products.through
+        rows = (
+            through.objects
+            .filter(order_id__in=keys)
+            .select_related("product")
+            .order_by("order_id", "product_id")
+        )
+        products = defaultdict(list)
+        for row in rows:
+            products[row.order_id].append(row.product)
+        return products
+
+
+class Loaders:
+    def __init__(self):
+        self.customer = CustomerLoader()
+        self.order_products = OrderProductsLoader()
+
+
+def get_loaders(context):
+    """Return the loaders bound to this request, creating them on first use."""
+    if context is None:
+        return Loaders()
+    loaders = getattr(context, "loaders", None)
+    if loaders is None:
+        loaders = Loaders()
+        context.loaders = loaders
+    return loaders
+
+
+def prime_order_loaders(context, orders):
+    """Queue the relations of ``orders`` so they load in one batch each."""
+    loaders = get_loaders(context)
+    # skip relations the optimizer already joined/prefetched, and never touch
+    # a deferred customer_id (that would cost one query per order)
+    loaders.customer.prime(
+        order.customer_id for order in orders
+        if "customer_id" in order.__dict__ and not Order.customer.is_cached(order)
+    )
+    loaders.order_products.prime(
+        order.pk for order in orders
+        if "products" not in getattr(order, "_prefetched_objects_cache", {})
+    )
+    return orders
+
+
+def load_order_customer(order, info):
+    """Customer of ``order``; reuses a select_related join when present."""
+    if Order.customer.is_cached(order):
+        return order.customer
+    return get_loaders(info.context).customer.load(order.customer_id)
+
+
+def load_order_products(order, info):
+    """Products of ``order``; reuses a prefetch when present."""
+    if "products" in getattr(order, "_prefetched_objects_cache", {}):
+        return list(order.products.all())
+    return get_loaders(info.context).order_products.load(order.pk)
+
+
+class OrderConnectionField(KeysetConnectionField):
+    """
+    Keyset connection field that also primes the order loaders with the
+    page of orders it is about to return.
+    """
+
+    @classmethod
+    def connection_resolver(cls, resolver, connection, default_manager, queryset_resolver,
+                            max_limit, enforce_first_or_last, root, info, **args):
+        result = super().connection_resolver(
+            resolver, connection, default_manager, queryset_resolver,
+            max_limit, enforce_first_or_last, root, info, **args
+        )
+        edges = getattr(result, "edges", None)
+        if edges is not None:
+            prime_order_loaders(info.context, [edge.node for edge in edges])
+        return result
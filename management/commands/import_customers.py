@@ -0,0 +1,170 @@
+# crm/management/commands/import_customers.py
+"""
+Stream a CSV or NDJSON file of customers into the database.
+
+    python manage.py import_customers customers.csv --chunk-size 5000
+    zcat customers.ndjson.gz | python manage.py import_customers - --format ndjson
+
+Records flow through generators (read -> clean -> chunk -> insert), so
+memory stays flat whatever the file size: only one chunk is held at a time.
+Each chunk costs one query to find emails that already exist and one
+``bulk_create`` in its own transaction, so a crash loses at most one chunk
+and re-running the import skips everything already loaded.
+
+Rejected records go to ``--rejects`` (default ``<file>.rejected.ndjson``),
+one JSON object per line with the source line number, the reason and the
+original record.
+"""
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+
+from crm.models import Customer, normalize_email
+from crm.response_cache import invalidate_models
+from crm.schema import insert_customers, validate_phone
+
+FIELDS = ("name", "email", "phone")
+
+
+def read_csv(stream):
+    reader = csv.DictReader(stream)
+    missing = {"name", "email"} - set(reader.fieldnames or ())
+    if missing:
+        raise CommandError(f"CSV header is missing: {', '.join(sorted(missing))}")
+    for record in reader:
+        # line_num is the reader's position, so it stays right for quoted newlines
+        yield reader.line_num, record
+
+
+def read_ndjson(stream):
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, line.rstrip("\n")
+            continue
+        yield line_number, record
+
+
+def clean(records, rejected):
+    """Yield ``(line, record, Customer)`` for valid records; reject the rest."""
+    name_length = Customer._meta.get_field("name").max_length
+    phone_length = Customer._meta.get_field("phone").max_length
+    for line, record in records:
+        if not isinstance(record, dict):
+            rejected(line, "Malformed record", record)
+            continue
+        name, email, phone = ((str(record.get(field) or "")).strip() for field in FIELDS)
+        phone = phone or None
+        if not name or len(name) > name_length:
+            rejected(line, "Invalid name", record)
+            continue
+        try:
+            validate_email(email)
+        except ValidationError:
+            rejected(line, f"Invalid email: {email}", record)
+            continue
+        if not validate_phone(phone) or (phone and len(phone) > phone_length):
+            rejected(line, f"Invalid phone: {phone}", record)
+            continue
+        yield line, record, Customer(name=name, email=email, email_normalized=normalize_email(email), phone=phone)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = "Stream customers from a CSV or NDJSON file into the database in chunked transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV/NDJSON file, or - for stdin.")
+        parser.add_argument("--format", choices=("csv", "ndjson"),
+                            help="Input format (default: from the file extension).")
+        parser.add_argument("--chunk-size", type=int, default=1000,
+                            help="Rows per transaction (default 1000).")
+        parser.add_argument("--rejects", help="Where to write rejected rows (NDJSON).")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"]
+        if fmt is None:
+            if path == "-":
+                raise CommandError("--format is required when reading from stdin.")
+            fmt = "csv" if path.lower().endswith(".csv") else "ndjson"
+        chunk_size = options["chunk_size"]
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be positive.")
+        rejects_path = options["rejects"] or (
+            "rejected.ndjson" if path == "-" else f"{os.path.splitext(path)[0]}.rejected.ndjson"
+        )
+
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8-sig")
+        counts = {"read": 0, "created": 0, "rejected": 0}
+        start = time.perf_counter()
+        try:
+            with stream, open(rejects_path, "w", encoding="utf-8") as rejects:
+                def rejected(line, reason, record):
+                    counts["rejected"] += 1
+                    rejects.write(json.dumps({"line": line, "reason": reason, "record": record}, default=str) + "\n")
+
+                reader = read_csv(stream) if fmt == "csv" else read_ndjson(stream)
+                records = self.count(reader, counts)
+                for chunk in chunked(clean(records, rejected), chunk_size):
+                    self.import_chunk(chunk, rejected, counts)
+                    if options["verbosity"] >= 2:
+                        self.stderr.write(self.progress(counts, start))
+        finally:
+            if counts["created"]:
+                invalidate_models(Customer)
+
+        self.stdout.write(self.style.SUCCESS(self.progress(counts, start)))
+        if counts["rejected"]:
+            self.stdout.write(f"Rejected rows written to {rejects_path}")
+
+    def count(self, records, counts):
+        for item in records:
+            counts["read"] += 1
+            yield item
+
+    def import_chunk(self, chunk, rejected, counts):
+        # one query per chunk; earlier chunks are committed, so this also
+        # catches duplicates from further up the same file
+        existing = set(
+            Customer.objects.filter(email_normalized__in={customer.email_normalized for _, _, customer in chunk})
+            .values_list("email_normalized", flat=True)
+        )
+        rows = []
+        for line, record, customer in chunk:
+            if customer.email_normalized in existing:
+                rejected(line, f"Duplicate email: {customer.email}", record)
+                continue
+            existing.add(customer.email_normalized)
+            rows.append((line, record, customer))
+
+        created, _ = insert_customers([customer for _, _, customer in rows])
+        created_emails = {customer.email_normalized for customer in created}
+        for line, record, customer in rows:
+            # lost a race with another writer since the existence check
+            if customer.email_normalized not in created_emails:
+                rejected(line, f"Duplicate email: {customer.email}", record)
+        counts["created"] += len(created)
+
+    def progress(self, counts, start):
+        elapsed = time.perf_counter() - start
+        rate = counts["read"] / elapsed if elapsed else 0.0
+        return (
+            f"{counts['read']} rows read, {counts['created']} imported, {counts['rejected']} rejected "
+            f"in {elapsed:.1f}s ({rate:.0f} rows/s)"
+        )
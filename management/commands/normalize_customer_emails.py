@@ -0,0 +1,43 @@
+# crm/management/commands/normalize_customer_emails.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Lower, Trim
+
+from crm.models import Customer
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill Customer.email_normalized for rows created before the column existed. "
+        "Emails that differ only in case or whitespace are listed and left for a manual merge."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        normalized = Lower(Trim("email"))
+        clashes = list(
+            Customer.objects.annotate(key=normalized).values("key")
+            .annotate(n=Count("id")).filter(n__gt=1).values_list("key", flat=True)
+        )
+        pending = Customer.objects.filter(email_normalized__isnull=True).exclude(
+            pk__in=Customer.objects.annotate(key=normalized).filter(key__in=clashes).values("pk")
+        )
+
+        filled = 0
+        last_pk = 0
+        while True:
+            ids = list(
+                pending.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:options["batch_size"]]
+            )
+            if not ids:
+                break
+            last_pk = ids[-1]
+            with transaction.atomic():
+                filled += Customer.objects.filter(pk__in=ids).update(email_normalized=normalized)
+
+        self.stdout.write(self.style.SUCCESS(f"Normalized {filled} emails."))
+        for key in clashes:
+            self.stdout.write(self.style.WARNING(f"Duplicate customers for {key}: merge them, then re-run."))
@@ -0,0 +1,15 @@
+# crm/management/commands/repair_crm_stats.py
+from django.core.management.base import BaseCommand
+
+from crm.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the CRMStats totals (totalCustomers/totalOrders/totalRevenue) from scratch."
+
+    def handle(self, *args, **options):
+        stats = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(
+            "Stats rebuilt: {total_customers} customers, {total_orders} orders, "
+            "{total_revenue} revenue".format(**stats)
+        ))
@@ -0,0 +1,83 @@
+"""
+Turn Order.products into a ManyToManyField through OrderItem.
+
+Django can't AlterField an auto-created M2M table into a ``through`` model,
+so the links are moved by hand: OrderItem is created, every row of the old
+``crm_order_products`` table is copied into it with ``quantity=1`` and the
+product's current price as ``unit_price``, and only then is the old table
+dropped while the model state switches the field to ``through``.
+"""
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def copy_order_products(apps, schema_editor):
+    Order = apps.get_model("crm", "Order")
+    OrderItem = apps.get_model("crm", "OrderItem")
+    links = Order.products.through.objects.order_by("pk").values_list("order_id", "product_id", "product__price")
+    batch = []
+    for order_id, product_id, price in links.iterator(chunk_size=BATCH_SIZE):
+        batch.append(OrderItem(order_id=order_id, product_id=product_id, quantity=1, unit_price=price))
+        if len(batch) == BATCH_SIZE:
+            OrderItem.objects.bulk_create(batch)
+            batch = []
+    OrderItem.objects.bulk_create(batch)
+
+
+def copy_order_items_back(apps, schema_editor):
+    Order = apps.get_model("crm", "Order")
+    OrderItem = apps.get_model("crm", "OrderItem")
+    through = Order.products.through
+    rows = OrderItem.objects.order_by("pk").values_list("order_id", "product_id")
+    batch = []
+    for order_id, product_id in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(through(order_id=order_id, product_id=product_id))
+        if len(batch) == BATCH_SIZE:
+            through.objects.bulk_create(batch)
+            batch = []
+    through.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("crm", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderItem",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("quantity", models.PositiveIntegerField(default=1)),
+                ("unit_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("order", models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name="items", to="crm.order",
+                )),
+                ("product", models.ForeignKey(
+                    on_delete=django.db.models.deletion.PROTECT, related_name="order_items", to="crm.product",
+                )),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("order", "product"), name="orderitem_order_product_uniq"),
+                ],
+            },
+        ),
+        migrations.RunPython(copy_order_products, copy_order_items_back),
+        migrations.SeparateDatabaseAndState(
+            # drops crm_order_products (recreated on the way back)
+            database_operations=[
+                migrations.RemoveField(model_name="order", name="products"),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="order",
+                    name="products",
+                    field=models.ManyToManyField(through="crm.OrderItem", to="crm.product"),
+                ),
+            ],
+        ),
+    ]
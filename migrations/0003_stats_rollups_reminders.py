@@ -0,0 +1,167 @@
+"""
+The rest of the schema the CRM models grew: insertion timestamps, the
+normalized email column, the query indexes, the stats counters, the daily
+rollups and the reminder ledger.
+
+Existing customers and orders get the migration time as ``created_at``.
+The stats shards are seeded from the tables as they stand, like
+``manage.py repair_crm_stats``; the rollups start empty and their first
+fold (or ``manage.py rebuild_crm_rollups``) covers every existing row.
+"""
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def seed_stats(apps, schema_editor):
+    CRMStats = apps.get_model("crm", "CRMStats")
+    Customer = apps.get_model("crm", "Customer")
+    Order = apps.get_model("crm", "Order")
+    CRMStats.objects.create(
+        shard=0,
+        total_customers=Customer.objects.count(),
+        total_orders=Order.objects.count(),
+        total_revenue=Order.objects.aggregate(revenue=Sum("total_amount"))["revenue"] or 0,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("crm", "0002_orderitem"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customer",
+            name="email_normalized",
+            field=models.CharField(editable=False, max_length=254, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(fields=["created_at"], name="customer_created_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["stock"], name="product_stock_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(condition=models.Q(("stock__lt", 10)), fields=["id"], name="product_low_stock_idx"),
+        ),
+        # the (customer, order_date) index below serves the FK lookups
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["customer", "order_date"], name="order_customer_date_idx"),
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="customer",
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to="crm.customer"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["order_date", "id"], name="order_date_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["total_amount"], name="order_total_amount_idx"),
+        ),
+        migrations.CreateModel(
+            name="CRMStats",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("shard", models.PositiveSmallIntegerField(unique=True)),
+                ("total_customers", models.BigIntegerField(default=0)),
+                ("total_orders", models.BigIntegerField(default=0)),
+                ("total_revenue", models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+            ],
+        ),
+        migrations.RunPython(seed_stats, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="DailyOrderRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField(unique=True)),
+                ("orders", models.BigIntegerField(default=0)),
+                ("revenue", models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailyCustomerRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField(unique=True)),
+                ("new_customers", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailyProductSales",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("orders", models.BigIntegerField(default=0)),
+                ("quantity", models.BigIntegerField(default=0)),
+                ("revenue", models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ("product", models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name="daily_sales", to="crm.product",
+                )),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("product", "day"), name="daily_product_sales_uniq"),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyCustomerSales",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("orders", models.BigIntegerField(default=0)),
+                ("revenue", models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ("customer", models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name="daily_sales", to="crm.customer",
+                )),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("customer", "day"), name="daily_customer_sales_uniq"),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="OrderReminder",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("sent_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("claimed_by", models.UUIDField(db_index=True, editable=False, null=True)),
+                ("order", models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE, related_name="reminder", to="crm.order",
+                )),
+            ],
+        ),
+        migrations.CreateModel(
+            name="RollupWatermark",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("last_id", models.BigIntegerField(default=0)),
+                ("last_date", models.DateTimeField(null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
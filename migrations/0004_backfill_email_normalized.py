@@ -0,0 +1,44 @@
+"""
+Fill Customer.email_normalized for rows created before the column existed.
+
+Must run before bulkCreateCustomers / upsertCustomers are used: a NULL key
+never conflicts on ``email_normalized``, so those rows would be invisible
+to the duplicate checks. Emails that differ only in case or whitespace
+can't share the unique key; they stay NULL and ``manage.py
+normalize_customer_emails`` lists them for a manual merge.
+"""
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower, Trim
+
+BATCH_SIZE = 5000
+
+
+def backfill(apps, schema_editor):
+    Customer = apps.get_model("crm", "Customer")
+    normalized = Lower(Trim("email"))
+    clashes = (
+        Customer.objects.annotate(key=normalized).values("key")
+        .annotate(n=Count("id")).filter(n__gt=1).values("key")
+    )
+    pending = Customer.objects.filter(email_normalized__isnull=True).exclude(
+        pk__in=Customer.objects.annotate(key=normalized).filter(key__in=clashes).values("pk")
+    )
+    last_pk = 0
+    while True:
+        ids = list(pending.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:BATCH_SIZE])
+        if not ids:
+            break
+        last_pk = ids[-1]
+        Customer.objects.filter(pk__in=ids).update(email_normalized=normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("crm", "0003_stats_rollups_reminders"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
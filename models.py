@@ -1,30 +1,191 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+def normalize_email(email):
+    """The form emails are compared in: ``Alice@X.com `` == ``alice@x.com``."""
+    return email.strip().lower() if email else email
+
 class Customer(models.Model):
     name = models.CharField(max_length=255)
     email = models.EmailField(unique=True)
+    # normalize_email(email); unique, so case variants can't both be stored.
+    # Set by save(); bulk_create callers must fill it in themselves.
+    email_normalized = models.CharField(max_length=254, unique=True, null=True, editable=False)
     phone = models.CharField(max_length=20, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # CustomerFilter created_at ranges, cleanup's created_at__lt
+            models.Index(fields=["created_at"], name="customer_created_at_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.email_normalized = normalize_email(self.email)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "email" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "email_normalized"}
+        super().save(*args, **kwargs)
+
 class Product(models.Model):
     name = models.CharField(max_length=255)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            # ProductFilter stock ranges
+            models.Index(fields=["stock"], name="product_stock_idx"),
+            # low_stock / UpdateLowStockProducts: only the few rows under 10
+            # (skipped on backends without partial indexes)
+            models.Index(fields=["id"], condition=models.Q(stock__lt=10), name="product_low_stock_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
+def line_total_expression():
+    """quantity * unit_price, evaluated in SQL"""
+    return models.ExpressionWrapper(
+        models.F("quantity") * models.F("unit_price"),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+    )
+
+class OrderQuerySet(models.QuerySet):
+    def update_totals(self):
+        """Recompute total_amount from the line items in one UPDATE."""
+        totals = (
+            OrderItem.objects.filter(order=models.OuterRef("pk"))
+            .values("order")
+            .annotate(total=models.Sum(line_total_expression()))
+            .values("total")
+        )
+        return self.update(total_amount=Coalesce(
+            models.Subquery(totals), models.Value(0),
+            output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        ))
+
 class Order(models.Model):
-    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
-    products = models.ManyToManyField(Product)
+    # indexed through (customer, order_date) below
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, db_index=False)
+    products = models.ManyToManyField(Product, through="OrderItem")
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     order_date = models.DateTimeField(default=timezone.now)
+    # when the row was inserted; order_date is client-supplied and may be
+    # backdated or in the future (crm/rollups.py settles on this instead)
+    created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = OrderQuerySet.as_manager()
 
-python manage.py makemigrations
+    class Meta:
+        indexes = [
+            # a customer's orders by date; also serves the FK lookups
+            models.Index(fields=["customer", "order_date"], name="order_customer_date_idx"),
+            # order_date ranges and the (order_date, id) keyset cursor
+            models.Index(fields=["order_date", "id"], name="order_date_id_idx"),
+            # OrderFilter total_amount ranges
+            models.Index(fields=["total_amount"], name="order_total_amount_idx"),
+        ]
+
+class OrderItemQuerySet(models.QuerySet):
+    def revenue(self):
+        """SUM(quantity * unit_price) over the filtered line items."""
+        return self.aggregate(revenue=models.Sum(line_total_expression()))["revenue"] or 0
+
+class OrderItem(models.Model):
+    # Line item: quantity and the price at purchase time
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name="order_items")
+    quantity = models.PositiveIntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    objects = OrderItemQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["order", "product"], name="orderitem_order_product_uniq"),
+        ]
+
+    @property
+    def line_total(self):
+        return self.quantity * self.unit_price
+
+class CRMStats(models.Model):
+    """
+    Running totals behind totalCustomers / totalOrders / totalRevenue.
+
+    Spread over a few shard rows so concurrent writers don't all queue on
+    one row lock; the totals are the sum of the shards. Maintained by
+    crm/stats.py, rebuilt by `manage.py repair_crm_stats`.
+    """
+    shard = models.PositiveSmallIntegerField(unique=True)
+    total_customers = models.BigIntegerField(default=0)
+    total_orders = models.BigIntegerField(default=0)
+    total_revenue = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+class DailyOrderRollup(models.Model):
+    """Orders and revenue per order_date day, folded in by crm/rollups.py."""
+    day = models.DateField(unique=True)
+    orders = models.BigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+class DailyCustomerRollup(models.Model):
+    """New customers per created_at day, folded in by crm/rollups.py."""
+    day = models.DateField(unique=True)
+    new_customers = models.BigIntegerField(default=0)
+
+class DailyProductSales(models.Model):
+    """Per-day, per-product order lines (salesSummary with productId)."""
+    day = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="daily_sales")
+    orders = models.BigIntegerField(default=0)
+    quantity = models.BigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["product", "day"], name="daily_product_sales_uniq"),
+        ]
+
+class DailyCustomerSales(models.Model):
+    """Per-day, per-customer orders (salesSummary with customerId)."""
+    day = models.DateField()
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name="daily_sales")
+    orders = models.BigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["customer", "day"], name="daily_customer_sales_uniq"),
+        ]
+
+class OrderReminder(models.Model):
+    """
+    One row per order that got its reminder, shared by every Celery worker
+    running crm.pipeline.remind_orders_chunk.
+    """
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name="reminder")
+    sent_at = models.DateTimeField(default=timezone.now)
+    # the chunk run that inserted the claim; it sends only what it claimed
+    claimed_by = models.UUIDField(null=True, editable=False, db_index=True)
+
+class RollupWatermark(models.Model):
+    """
+    How far a rollup has folded its source table: every row with
+    ``id <= last_id`` is counted. ``last_date`` is the newest date folded.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    last_date = models.DateTimeField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+# the schema changes ship in crm/migrations; 0002 moves the old
+# order_products links into OrderItem, so run migrate, not makemigrations
 python manage.py migrate
 
 
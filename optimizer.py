@@ -0,0 +1,123 @@
+# crm/optimizer.py
+"""
+Selection-set-aware queryset optimizer.
+
+Reads the fields the client actually selected from ``info`` and shapes the
+base queryset to match:
+
+* forward FK / one-to-one selections   -> ``select_related``
+* M2M / reverse FK selections          -> ``prefetch_related`` with a
+                                          ``Prefetch`` that is itself optimized
+* plain columns                        -> ``.only()``
+
+``orders { id totalAmount }`` therefore reads ``id, total_amount`` and joins
+nothing. If a selection contains a field that is not a model field (a custom
+resolver), column projection is skipped for that model so the resolver still
+sees every attribute it may need.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_snake_case
+from graphene_django.filter import DjangoFilterConnectionField
+from graphql import FieldNode, FragmentSpreadNode, InlineFragmentNode
+
+
+def _collect(selection_set, fragments, into):
+    """Merge a selection set into a nested ``{field_name: {...}}`` dict."""
+    if selection_set is None:
+        return into
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            child = into.setdefault(selection.name.value, {})
+            _collect(selection.selection_set, fragments, child)
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = fragments.get(selection.name.value)
+            if fragment is not None:
+                _collect(fragment.selection_set, fragments, into)
+        elif isinstance(selection, InlineFragmentNode):
+            _collect(selection.selection_set, fragments, into)
+    return into
+
+
+def _unwrap_connection(selection):
+    """``{edges: {node: {...}}}`` -> ``{...}``; plain lists pass through."""
+    if "edges" in selection:
+        return selection["edges"].get("node", {})
+    return selection
+
+
+def get_selection(info):
+    """Selected sub-fields of the field currently being resolved."""
+    selection = {}
+    for field_node in info.field_nodes:
+        _collect(field_node.selection_set, info.fragments, selection)
+    return _unwrap_connection(selection)
+
+
+def _plan(model, selection, prefix=""):
+    """
+    Walk ``selection`` for ``model`` and return ``(only, select, prefetch)``.
+
+    ``only`` is ``None`` when projection has to be skipped.
+    """
+    only = {prefix + model._meta.pk.name}
+    select, prefetch = [], []
+
+    for name, sub in selection.items():
+        if name == "__typename":
+            continue
+        attname = "pk" if name == "id" else to_snake_case(name)
+        try:
+            field = model._meta.pk if attname == "pk" else model._meta.get_field(attname)
+        except FieldDoesNotExist:
+            only = None
+            continue
+
+        if field.many_to_many or field.one_to_many:
+            related = field.related_model
+            lookup = prefix + (field.get_accessor_name() if field.auto_created else field.name)
+            # reverse FK prefetches match rows back on the FK column
+            required = (field.field.attname,) if field.one_to_many else ()
+            queryset = _apply(related._default_manager.all(), _unwrap_connection(sub), required)
+            prefetch.append(Prefetch(lookup, queryset=queryset))
+        elif field.is_relation:
+            # forward FK / one-to-one: join it and project the related columns
+            path = prefix + field.name
+            select.append(path)
+            sub_only, sub_select, sub_prefetch = _plan(field.related_model, sub, path + "__")
+            if only is not None:
+                only.add(path)
+                only = None if sub_only is None else only | sub_only
+            select.extend(sub_select)
+            prefetch.extend(sub_prefetch)
+        elif only is not None:
+            only.add(prefix + field.attname)
+
+    return only, select, prefetch
+
+
+def _apply(queryset, selection, required=()):
+    if not selection:
+        return queryset
+    only, select, prefetch = _plan(queryset.model, selection)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if only is not None:
+        queryset = queryset.only(*only, *required)
+    return queryset
+
+
+def optimize_queryset(queryset, info):
+    """Apply select_related / prefetch_related / only() for ``info``."""
+    return _apply(queryset, get_selection(info))
+
+
+class OptimizedConnectionField(DjangoFilterConnectionField):
+    """DjangoFilterConnectionField whose filtered queryset is optimized."""
+
+    @classmethod
+    def resolve_queryset(cls, connection, iterable, info, args, *rest, **kwargs):
+        qs = super().resolve_queryset(connection, iterable, info, args, *rest, **kwargs)
+        return optimize_queryset(qs, info)
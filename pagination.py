@@ -0,0 +1,183 @@
+# crm/pagination.py
+"""
+Keyset (seek) pagination for the relay connections.
+
+graphene-django's default cursors are array offsets, which turn into
+``OFFSET n LIMIT m`` (plus a ``COUNT(*)``) and slow down linearly as clients
+page deeper. Here the cursor encodes the sort key of the row it points at,
+e.g. ``(order_date, id)``, and the next page is fetched with
+
+    WHERE (order_date, id) > (:order_date, :id) ORDER BY order_date, id LIMIT m
+
+so page 10,000 costs the same as page 1 given an index on the sort key.
+
+The sort key comes from the queryset ordering, i.e. whatever ``orderBy`` the
+filterset applied (falling back to the connection's default ordering), with
+the primary key appended as a tie-breaker. Sort fields must be non-null
+columns of the model itself.
+
+Types paged this way use ``KeysetConnection``, whose ``totalCount`` runs the
+``COUNT(*)`` only when a query selects it.
+"""
+import base64
+import json
+
+import graphene
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from graphene.relay import Connection, PageInfo
+from graphene_django.settings import graphene_settings
+from graphql import GraphQLError
+
+from .optimizer import OptimizedConnectionField
+
+KEY_PREFIX = "_keyset_"
+
+
+def get_sort_key(queryset):
+    """``[(field_name, descending), ...]`` for ``queryset``, ending in the pk."""
+    model = queryset.model
+    pk_name = model._meta.pk.name
+    ordering = list(queryset.query.order_by) or list(model._meta.ordering)
+
+    keys = []
+    for term in ordering:
+        term = str(term)
+        descending = term.startswith("-")
+        name = term.lstrip("-+")
+        if name == "pk":
+            name = pk_name
+        if "__" in name or "?" in name:
+            raise GraphQLError(f"Cannot paginate by '{term}': keyset pagination needs a column of {model.__name__}.")
+        keys.append((name, descending))
+        if name == pk_name:
+            break
+    else:
+        keys.append((pk_name, keys[-1][1] if keys else False))
+    return keys
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, model, keys):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise GraphQLError("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise GraphQLError("Cursor does not match the requested orderBy.")
+    return [model._meta.get_field(name).to_python(value) for (name, _), value in zip(keys, values)]
+
+
+def seek(queryset, keys, values, forward=True):
+    """Rows strictly after (``forward``) or before the row at ``values``."""
+    condition = Q()
+    equal = Q()
+    for (name, descending), value in zip(keys, values):
+        lookup = "gt" if descending != forward else "lt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return queryset.filter(condition)
+
+
+def keyset_page(queryset, keys, first=None, last=None, after=None, before=None):
+    """
+    Fetch one page; returns ``(rows, has_previous_page, has_next_page)``.
+
+    Each row carries its sort key as ``_keyset_<i>`` annotations, so cursors
+    can be built even when the optimizer deferred the sort columns.
+    """
+    model = queryset.model
+    queryset = queryset.annotate(**{f"{KEY_PREFIX}{i}": F(name) for i, (name, _) in enumerate(keys)})
+    order = [f"-{name}" if descending else name for name, descending in keys]
+    reverse = [name[1:] if name.startswith("-") else f"-{name}" for name in order]
+
+    if after:
+        queryset = seek(queryset, keys, decode_cursor(after, model, keys), forward=True)
+    if before:
+        queryset = seek(queryset, keys, decode_cursor(before, model, keys), forward=False)
+
+    if last is not None and first is None:
+        rows = list(queryset.order_by(*reverse)[:last + 1])
+        has_more = len(rows) > last
+        rows = rows[:last][::-1]
+        return rows, has_more, bool(before)
+
+    rows = list(queryset.order_by(*order)[:first + 1])
+    has_more = len(rows) > first
+    rows = rows[:first]
+    has_previous = bool(after)
+    if last is not None:
+        # first/last together: the last ``last`` of the first ``first`` rows
+        has_previous = has_previous or len(rows) > last
+        rows = rows[len(rows) - last:] if last else []
+    return rows, has_previous, has_more
+
+
+def row_cursor(row, keys):
+    return encode_cursor([getattr(row, f"{KEY_PREFIX}{i}") for i in range(len(keys))])
+
+
+class KeysetConnection(Connection):
+    """Connection with a lazy ``totalCount``, for types paged by ``KeysetConnectionField``."""
+
+    class Meta:
+        abstract = True
+
+    total_count = graphene.Int()
+
+    def resolve_total_count(root, info):
+        return root.iterable.count()
+
+
+class KeysetConnectionField(OptimizedConnectionField):
+    """
+    Optimized filter connection with keyset cursors instead of offsets.
+
+    ``default_order`` is used when the client does not pass ``orderBy``.
+    """
+
+    def __init__(self, *args, default_order=(), **kwargs):
+        self.default_order = tuple(default_order)
+        super().__init__(*args, **kwargs)
+
+    def get_queryset_resolver(self):
+        resolver = super().get_queryset_resolver()
+        default_order = self.default_order
+
+        def resolve_queryset(connection, iterable, info, args):
+            qs = resolver(connection, iterable, info, args)
+            if not qs.query.order_by and default_order:
+                qs = qs.order_by(*default_order)
+            return qs
+
+        return resolve_queryset
+
+    @classmethod
+    def resolve_connection(cls, connection, args, iterable, max_limit=None):
+        if args.get("offset"):
+            raise GraphQLError("offset is not supported on keyset connections, page with after/before.")
+
+        first, last = args.get("first"), args.get("last")
+        if first is None and last is None:
+            first = max_limit or graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+
+        keys = get_sort_key(iterable)
+        rows, has_previous, has_next = keyset_page(
+            iterable, keys, first=first, last=last, after=args.get("after"), before=args.get("before"),
+        )
+        edges = [connection.Edge(node=row, cursor=row_cursor(row, keys)) for row in rows]
+        result = connection(
+            edges=edges,
+            page_info=PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=has_previous,
+                has_next_page=has_next,
+            ),
+        )
+        result.iterable = iterable
+        return result
@@ -0,0 +1,236 @@
+# crm/response_cache.py
+"""
+Response cache for read-only GraphQL operations.
+
+Query results are stored in Django's cache framework under a key built from
+
+* the normalized document (``print_ast`` of the parsed document),
+* the operation name and variables,
+* a version number for every model table the operation can read.
+
+Writes never delete entries; they bump the version of the tables they touch,
+so every key that depended on those tables stops matching and ages out. The
+mutations declare what they write in ``MUTATION_WRITES``; saves and deletes
+made outside GraphQL (admin, scripts, cron jobs) are caught by signals.
+
+The versions must be seen by every process that reads or writes: all web
+workers, the cron jobs and the Celery workers. So the cache needs a shared
+backend (Redis, Memcached), set with ``GRAPHQL_RESPONSE_CACHE_ALIAS``. On a
+process-local backend (locmem, dummy) it stays off, because a write in one
+process would leave stale entries in the others. Set
+``GRAPHQL_RESPONSE_CACHE_ALLOW_LOCAL = True`` to use it anyway in tests or
+with a single process.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from graphql import FieldNode, FragmentSpreadNode, InlineFragmentNode, get_named_type, print_ast
+
+from .models import (
+    Customer,
+    DailyCustomerSales,
+    DailyOrderRollup,
+    DailyProductSales,
+    Order,
+    OrderItem,
+    Product,
+)
+
+KEY_PREFIX = "crm:rc:"
+
+# root mutation field -> models it writes
+MUTATION_WRITES = {
+    "createCustomer": (Customer,),
+    "bulkCreateCustomers": (Customer,),
+    "upsertCustomers": (Customer,),
+    "createProduct": (Product,),
+    "bulkCreateProducts": (Product,),
+    "createOrder": (Order, OrderItem, Product),
+    "bulkCreateOrders": (Order, OrderItem, Product),
+    "updateLowStockProducts": (Product,),
+}
+
+# "Type.field" -> models read by fields that don't return a Django type
+FIELD_READS = {
+    "Query.totalCustomers": (Customer,),
+    "Query.totalOrders": (Order,),
+    "Query.totalRevenue": (Order,),
+    # rollups are bumped by each fold; Order/OrderItem for the customer+product path
+    "Query.salesSummary": (DailyOrderRollup, DailyCustomerSales, DailyProductSales, Order, OrderItem),
+}
+
+
+def get_cache():
+    return caches[getattr(settings, "GRAPHQL_RESPONSE_CACHE_ALIAS", "default")]
+
+
+def response_cache_enabled():
+    if not getattr(settings, "GRAPHQL_RESPONSE_CACHE", True):
+        return False
+    if getattr(settings, "GRAPHQL_RESPONSE_CACHE_ALLOW_LOCAL", False):
+        return True
+    return not isinstance(get_cache(), (LocMemCache, DummyCache))
+
+
+def get_timeout():
+    return getattr(settings, "GRAPHQL_RESPONSE_CACHE_TIMEOUT", 300)
+
+
+def _version_key(model):
+    return f"{KEY_PREFIX}v:{model._meta.db_table}"
+
+
+def table_versions(models):
+    cache = get_cache()
+    keys = sorted(_version_key(model) for model in models)
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # start from a timestamp so an evicted counter never reuses old keys
+            cache.add(key, time.time_ns())
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate_models(*models):
+    """Bump the version of every table written by ``models``."""
+    cache = get_cache()
+    for model in models:
+        key = _version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def invalidate_on_commit(*models):
+    transaction.on_commit(lambda: invalidate_models(*models))
+
+
+def _model_for(graphql_type):
+    graphene_type = getattr(graphql_type, "graphene_type", None)
+    meta = getattr(graphene_type, "_meta", None)
+    return getattr(meta, "model", None)
+
+
+def touched_models(schema, document, operation):
+    """
+    Models an operation can read: every Django type in the selection, plus
+    the models those reach through FK/M2M (filters such as ``customerName``
+    read them without selecting them).
+    """
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if definition.kind == "fragment_definition"
+    }
+    models = set()
+
+    def walk_type(selection_set, type_):
+        model = _model_for(type_)
+        if model is not None:
+            models.add(model)
+        walk(selection_set, type_)
+
+    def walk(selection_set, parent_type):
+        if selection_set is None:
+            return
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                field = getattr(parent_type, "fields", {}).get(selection.name.value)
+                if field is None:
+                    continue
+                models.update(FIELD_READS.get(f"{parent_type.name}.{selection.name.value}", ()))
+                walk_type(selection.selection_set, get_named_type(field.type))
+            elif isinstance(selection, InlineFragmentNode):
+                # the type condition can name a type the enclosing field didn't
+                type_ = parent_type
+                if selection.type_condition is not None:
+                    type_ = schema.get_type(selection.type_condition.name.value)
+                walk_type(selection.selection_set, type_)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = fragments.get(selection.name.value)
+                if fragment is not None:
+                    walk_type(fragment.selection_set, schema.get_type(fragment.type_condition.name.value))
+
+    walk(operation.selection_set, schema.get_root_type(operation.operation))
+    for model in list(models):
+        for field in model._meta.get_fields():
+            # forward FK / M2M declared on the model
+            if field.is_relation and not field.auto_created and field.related_model is not None:
+                models.add(field.related_model)
+    return models
+
+
+def written_models(operation):
+    models = set()
+    for selection in operation.selection_set.selections:
+        if isinstance(selection, FieldNode):
+            models.update(MUTATION_WRITES.get(selection.name.value, ()))
+    return models
+
+
+def response_key(schema, document, operation, variables):
+    models = touched_models(schema, document, operation)
+    payload = json.dumps(
+        {
+            "document": print_ast(document),
+            "operation": operation.name.value if operation.name else None,
+            "variables": variables or {},
+            "versions": table_versions(models),
+        },
+        cls=DjangoJSONEncoder,
+        sort_keys=True,
+    )
+    return KEY_PREFIX + "r:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_response(key):
+    cache = get_cache()
+    data = cache.get(key)
+    stat = "hits" if data is not None else "misses"
+    try:
+        cache.incr(KEY_PREFIX + stat)
+    except ValueError:
+        cache.add(KEY_PREFIX + stat, 1, None)
+    return data
+
+
+def set_response(key, data):
+    get_cache().set(key, data, get_timeout())
+
+
+def response_cache_stats():
+    """``{"hits": n, "misses": n, "hitRate": float}`` since the last reset."""
+    stats = get_cache().get_many([KEY_PREFIX + "hits", KEY_PREFIX + "misses"])
+    hits = stats.get(KEY_PREFIX + "hits", 0)
+    misses = stats.get(KEY_PREFIX + "misses", 0)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hitRate": hits / total if total else 0.0}
+
+
+def reset_response_cache_stats():
+    get_cache().delete_many([KEY_PREFIX + "hits", KEY_PREFIX + "misses"])
+
+
+def _invalidate_sender(sender, **kwargs):
+    invalidate_on_commit(sender)
+
+
+def _invalidate_m2m(sender, instance, action, **kwargs):
+    if action.startswith("post_"):
+        invalidate_on_commit(type(instance), kwargs["model"])
+
+
+for _model in (Customer, Product, Order, OrderItem):
+    post_save.connect(_invalidate_sender, sender=_model, dispatch_uid=f"crm_rc_save_{_model.__name__}")
+    post_delete.connect(_invalidate_sender, sender=_model, dispatch_uid=f"crm_rc_delete_{_model.__name__}")
+m2m_changed.connect(_invalidate_m2m, sender=Order.products.through, dispatch_uid="crm_rc_order_products")
@@ -0,0 +1,246 @@
+# crm/rollups.py
+"""
+Incrementally maintained daily rollups for the CRM report and salesSummary.
+
+The tables:
+
+* ``DailyOrderRollup``: orders and revenue per day;
+* ``DailyCustomerRollup``: new customers per day;
+* ``DailyProductSales``: per day and product;
+* ``DailyCustomerSales``: per day and customer.
+
+Each rollup is folded forward from its own ``RollupWatermark``. A run only
+reads source rows with ``id`` above the watermark, in id batches. It adds
+their grouped counts to the rollup rows: one read of the rows it touches,
+then one ``bulk_update`` and one ``bulk_create``. Its cost tracks the new
+rows, not the table size. Folds of one rollup are serialized on its
+watermark row, so the read-then-add can't race. The weekly report reads at
+most seven rollup rows; a year of salesSummary reads a few hundred.
+
+Rows are only folded once they were inserted ``CRM_ROLLUP_SETTLE_SECONDS``
+ago (``created_at``, set by the server, never the client's ``order_date``).
+A transaction still in flight when a run starts then can't have its lower
+id skipped by the watermark, as long as it commits within the delay.
+Future-dated orders don't hold the fold back, and backdated ones still wait
+to settle. Later edits to already folded rows (deletes, ``total_amount``
+changes) are not seen. ``manage.py rebuild_crm_rollups`` recomputes
+everything.
+"""
+import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import (
+    Customer,
+    DailyCustomerRollup,
+    DailyCustomerSales,
+    DailyOrderRollup,
+    DailyProductSales,
+    Order,
+    OrderItem,
+    RollupWatermark,
+    line_total_expression,
+)
+from .response_cache import invalidate_on_commit
+
+FOLD_BATCH_SIZE = 10000
+
+
+def get_settle_delay():
+    return datetime.timedelta(seconds=getattr(settings, "CRM_ROLLUP_SETTLE_SECONDS", 60))
+
+
+def add_to_rollups(model, keys, rows):
+    """
+    Add grouped ``rows`` (dicts of ``keys`` + counter fields) to ``model``.
+
+    Existing rollup rows are incremented, missing ones created.
+    """
+    if not rows:
+        return
+    counters = [name for name in rows[0] if name not in keys]
+    lookup = {f"{key}__in": {row[key] for row in rows} for key in keys}
+    # a superset of the rows we need, bounded by the batch's days and keys
+    existing = {tuple(getattr(obj, key) for key in keys): obj for obj in model.objects.filter(**lookup)}
+    changed, created = [], []
+    for row in rows:
+        obj = existing.get(tuple(row[key] for key in keys))
+        if obj is None:
+            created.append(model(**row))
+            continue
+        for name in counters:
+            setattr(obj, name, getattr(obj, name) + (row[name] or 0))
+        changed.append(obj)
+    model.objects.bulk_update(changed, counters, batch_size=1000)
+    model.objects.bulk_create(created, batch_size=1000)
+
+
+def fold_orders(orders):
+    per_day = (
+        orders.annotate(day=TruncDate("order_date")).values("day")
+        .annotate(orders=Count("id"), revenue=Coalesce(Sum("total_amount"), Decimal("0"))).order_by()
+    )
+    add_to_rollups(DailyOrderRollup, ("day",), list(per_day))
+
+
+def fold_customers(customers):
+    per_day = customers.annotate(day=TruncDate("created_at")).values("day").annotate(new_customers=Count("id")).order_by()
+    add_to_rollups(DailyCustomerRollup, ("day",), list(per_day))
+
+
+def fold_sales(orders):
+    per_customer = (
+        orders.annotate(day=TruncDate("order_date")).values("day", "customer_id")
+        .annotate(orders=Count("id"), revenue=Coalesce(Sum("total_amount"), Decimal("0"))).order_by()
+    )
+    add_to_rollups(DailyCustomerSales, ("day", "customer_id"), list(per_customer))
+
+    per_product = (
+        OrderItem.objects.filter(order__in=orders)
+        .annotate(day=TruncDate("order__order_date")).values("day", "product_id")
+        .annotate(
+            n_orders=Count("order_id", distinct=True),
+            units=Sum("quantity"),  # "quantity" itself would clash with the field
+            revenue=Coalesce(Sum(line_total_expression()), Decimal("0")),
+        ).order_by()
+    )
+    add_to_rollups(DailyProductSales, ("day", "product_id"), [
+        {"day": row["day"], "product_id": row["product_id"], "orders": row["n_orders"],
+         "quantity": row["units"], "revenue": row["revenue"]}
+        for row in per_product
+    ])
+
+
+# name -> (source model, date field, fold function, rollup models it fills)
+ROLLUPS = {
+    "orders": (Order, "order_date", fold_orders, (DailyOrderRollup,)),
+    "customers": (Customer, "created_at", fold_customers, (DailyCustomerRollup,)),
+    "sales": (Order, "order_date", fold_sales, (DailyCustomerSales, DailyProductSales)),
+}
+
+
+def settled_upper_id(model, last_id):
+    """Highest id above ``last_id`` that is safe to fold now, or ``None``."""
+    cutoff = timezone.now() - get_settle_delay()
+    new_rows = model.objects.filter(id__gt=last_id)
+    first_unsettled = new_rows.filter(created_at__gt=cutoff).aggregate(id=Min("id"))["id"]
+    settled = new_rows.filter(created_at__lte=cutoff)
+    if first_unsettled is not None:
+        settled = settled.filter(id__lt=first_unsettled)
+    return settled.aggregate(id=Max("id"))["id"]
+
+
+def fold(name, batch_size=FOLD_BATCH_SIZE):
+    """Fold the rows added to rollup ``name``'s source since its watermark; returns the count."""
+    model, date_field, fold_rows, targets = ROLLUPS[name]
+    RollupWatermark.objects.get_or_create(name=name)
+    last_id = RollupWatermark.objects.get(name=name).last_id
+    upper_id = settled_upper_id(model, last_id)
+    folded = 0
+    while upper_id is not None and last_id < upper_id:
+        with transaction.atomic():
+            # concurrent runs queue here instead of folding a batch twice
+            watermark = RollupWatermark.objects.select_for_update().get(name=name)
+            batch_end = min(watermark.last_id + batch_size, upper_id)
+            if watermark.last_id < batch_end:
+                rows = model.objects.filter(id__gt=watermark.last_id, id__lte=batch_end)
+                fold_rows(rows)
+                invalidate_on_commit(*targets)
+                stats = rows.aggregate(n=Count("id"), last_date=Max(date_field))
+                folded += stats["n"]
+                watermark.last_id = batch_end
+                if stats["last_date"] and (watermark.last_date is None or stats["last_date"] > watermark.last_date):
+                    watermark.last_date = stats["last_date"]
+                watermark.save(update_fields=["last_id", "last_date", "updated_at"])
+            last_id = watermark.last_id
+    return folded
+
+
+def fold_rollups(batch_size=FOLD_BATCH_SIZE):
+    return {name: fold(name, batch_size) for name in ROLLUPS}
+
+
+def rebuild_rollups(batch_size=100000):
+    """Drop every rollup and watermark and fold the tables again from id 0."""
+    with transaction.atomic():
+        RollupWatermark.objects.filter(name__in=list(ROLLUPS)).select_for_update().delete()
+        for _, _, _, targets in ROLLUPS.values():
+            for target in targets:
+                target.objects.all().delete()
+                invalidate_on_commit(target)
+    return fold_rollups(batch_size)
+
+
+def period_totals(days=7, today=None):
+    """New customers, orders and revenue for the last ``days`` days, from the rollups."""
+    today = today or timezone.localdate()
+    since = today - datetime.timedelta(days=days - 1)
+    orders = DailyOrderRollup.objects.filter(day__gte=since, day__lte=today).aggregate(
+        orders=Sum("orders"), revenue=Sum("revenue")
+    )
+    customers = DailyCustomerRollup.objects.filter(day__gte=since, day__lte=today).aggregate(n=Sum("new_customers"))
+    return {
+        "since": since,
+        "new_customers": customers["n"] or 0,
+        "orders": orders["orders"] or 0,
+        "revenue": orders["revenue"] or Decimal("0"),
+    }
+
+
+# ----------------------------
+# salesSummary
+# ----------------------------
+
+BUCKETS = {"DAY": None, "WEEK": TruncWeek, "MONTH": TruncMonth}
+
+
+def _bucketed(queryset, day_field, granularity, quantity):
+    period = F(day_field) if BUCKETS[granularity] is None else BUCKETS[granularity](day_field)
+    totals = {"revenue_total": Coalesce(Sum("revenue"), Decimal("0"))}
+    if quantity is not None:
+        totals["units"] = Sum(quantity)
+    return queryset.annotate(period=period).values("period").annotate(**totals).order_by("period")
+
+
+def sales_summary(start, end, granularity="DAY", customer_id=None, product_id=None):
+    """
+    ``[{"period", "orders", "quantity", "revenue"}]`` per bucket, oldest first.
+
+    ``start``/``end`` are inclusive dates; each bucket is labelled with its
+    first day. Served from the daily rollups, so it reflects orders up to the
+    last fold. Customer and product together have no rollup of their own, so
+    that combination reads that customer's order lines (a customer's orders
+    are an indexed range).
+    """
+    if customer_id is not None and product_id is not None:
+        lines = OrderItem.objects.filter(
+            product_id=product_id,
+            order__customer_id=customer_id,
+            order__order_date__date__gte=start,
+            order__order_date__date__lte=end,
+        ).annotate(day=TruncDate("order__order_date"), revenue=line_total_expression())
+        rows = _bucketed(lines, "day", granularity, "quantity").annotate(n_orders=Count("order_id", distinct=True))
+    else:
+        if product_id is not None:
+            source, quantity = DailyProductSales.objects.filter(product_id=product_id), "quantity"
+        elif customer_id is not None:
+            source, quantity = DailyCustomerSales.objects.filter(customer_id=customer_id), None
+        else:
+            source, quantity = DailyOrderRollup.objects.all(), None
+        source = source.filter(day__gte=start, day__lte=end)
+        rows = _bucketed(source, "day", granularity, quantity).annotate(n_orders=Sum("orders"))
+
+    return [
+        {
+            "period": row["period"].date() if isinstance(row["period"], datetime.datetime) else row["period"],
+            "orders": row["n_orders"] or 0,
+            "quantity": row.get("units"),
+            "revenue": row["revenue_total"],
+        }
+        for row in rows
+    ]
@@ -1,7 +1,7 @@
 # crm/schema.py
 import graphene
-from django.utils import timezone
-from products.models import Product
+from graphql import GraphQLError
+from .inventory import count_low_stock, restock_low_stock
 
 
 class UpdatedProductType(graphene.ObjectType):
@@ -12,36 +12,42 @@ class UpdatedProductType(graphene.ObjectType):
 class UpdateLowStockProducts(graphene.Mutation):
     success = graphene.Boolean()
     message = graphene.String()
+    count = graphene.Int()
     updated_products = graphene.List(UpdatedProductType)
 
     class Arguments:
-        pass  # No external arguments needed
-
-    def mutate(self, info):
-        low_stock_products = Product.objects.filter(stock__lt=10)
-
-        updated = []
-
-        for product in low_stock_products:
-            product.stock += 10
-            product.save()
-
-            updated.append(
-                UpdatedProductType(
-                    name=product.name,
-                    stock=product.stock,
-                )
+        threshold = graphene.Int(required=False, default_value=10)
+        increment = graphene.Int(required=False, default_value=10)
+        dry_run = graphene.Boolean(required=False, default_value=False)
+
+    def mutate(self, info, threshold=10, increment=10, dry_run=False):
+        if threshold < 0:
+            raise GraphQLError("Threshold cannot be negative.")
+        if increment < 1:
+            raise GraphQLError("Increment must be positive.")
+
+        if dry_run:
+            count = count_low_stock(threshold)
+            return UpdateLowStockProducts(
+                success=True,
+                message=f"{count} products would be restocked",
+                count=count,
+                updated_products=[],
             )
 
+        # One UPDATE ... SET stock = stock + increment WHERE stock < threshold
+        updated = restock_low_stock(threshold, increment)
+
         return UpdateLowStockProducts(
             success=True,
             message="Low stock products updated successfully",
-            updated_products=updated,
+            count=len(updated),
+            updated_products=[UpdatedProductType(name=name, stock=stock) for _, name, stock in updated],
         )
 
 # crm/cron.py
 import datetime
-import requests
+from crm.executor import run_operation
 
 def update_low_stock():
     log_file_path = '/tmp/low_stock_updates_log.txt'
@@ -51,21 +57,24 @@ def update_low_stock():
     mutation {
         updateLowStockProducts {
             success
-            updatedProducts
+            updatedProducts {
+                name
+                stock
+            }
         }
     }
     """
     
     try:
-        response = requests.post("http://localhost:8000/graphql", json={'query': mutation})
-        data = response.json().get('data', {}).get('updateLowStockProducts', {})
+        response = run_operation(mutation)
+        data = (response.get('data') or {}).get('updateLowStockProducts') or {}
         
         if data.get('success'):
             products = data.get('updatedProducts', [])
             with open(log_file_path, 'a') as f:
                 if products:
                     for p in products:
-                        f.write(f"[{now}] Updated: {p}\n")
+                        f.write(f"[{now}] Product: {p['name']}, New Stock: {p['stock']}\n")
                 else:
                     f.write(f"[{now}] No low stock products found.\n")
     except Exception as e:
@@ -1,61 +1,180 @@
 crm/cron_jobs/send_order_reminders.py
 
 #!/usr/bin/env python3
-
+"""
+Log a reminder for every order placed in the last 7 days, incrementally.
+
+Orders are paged through ``allOrders`` with keyset cursors, ``--batch-size``
+at a time, so no single response or batch grows with the backlog. After each
+batch the script commits two things together to a small SQLite ledger:
+
+* the batch's ``endCursor``: the next run, or a rerun after a crash, picks
+  up right after it instead of starting the 7-day window over;
+* the IDs of the orders reminded: an order already in the ledger is never
+  reminded again, even if the checkpoint is reset or the window overlaps.
+
+A crash between writing a batch's log lines and committing it can repeat
+that one batch (at-least-once). Ledger rows older than the window are
+pruned on each run.
+
+Pages are sorted by id, not order date, so an order created after the
+checkpoint sorts after it even when its order date is backdated into the
+window. If the server rejects the checkpoint (one saved by an older version
+of this script was sorted by order date), it is dropped and the run resumes
+after the highest order id in the ledger.
+"""
+import argparse
+import base64
+import json
+import sqlite3
 from datetime import datetime, timedelta
+
 from gql import gql, Client
+from gql.transport.exceptions import TransportQueryError
 from gql.transport.requests import RequestsHTTPTransport
 
 LOG_FILE = "/tmp/order_reminders_log.txt"
+STATE_FILE = "/tmp/order_reminders_state.sqlite3"
 GRAPHQL_ENDPOINT = "http://localhost:8000/graphql"
-
-def main():
-    # Calculate date range
-    seven_days_ago = (datetime.utcnow() - timedelta(days=7)).isoformat()
-
-    # GraphQL query
-    query = gql(
-        """
-        query GetRecentOrders($since: DateTime!) {
-            orders(orderDate_Gte: $since, status: "PENDING") {
-                id
-                customer {
-                    email
+WINDOW = timedelta(days=7)
+
+# Sorted by id, so the checkpoint only ever moves past orders already seen
+QUERY = gql(
+    """
+    query RemindableOrders($orderDate: [DateTime], $first: Int!, $after: String) {
+        allOrders(orderDate: $orderDate, orderBy: "id", first: $first, after: $after) {
+            edges {
+                node {
+                    id
+                    customer {
+                        email
+                    }
                 }
             }
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
         }
+    }
+    """
+)
+
+
+def open_state(path):
+    state = sqlite3.connect(path)
+    state.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS checkpoint (id INTEGER PRIMARY KEY CHECK (id = 1), cursor TEXT);
+        CREATE TABLE IF NOT EXISTS reminded (order_id TEXT PRIMARY KEY, sent_at TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS reminded_sent_at ON reminded (sent_at);
         """
     )
+    return state
+
+
+def load_cursor(state):
+    row = state.execute("SELECT cursor FROM checkpoint WHERE id = 1").fetchone()
+    return row[0] if row else None
+
+
+def ledger_cursor(state):
+    """An ``orderBy: "id"`` cursor just after the highest order id reminded."""
+    # order IDs are relay global IDs, base64("OrderType:<pk>")
+    pks = [
+        int(base64.b64decode(order_id).decode().rsplit(":", 1)[-1])
+        for order_id, in state.execute("SELECT order_id FROM reminded")
+    ]
+    if not pks:
+        return None
+    return base64.urlsafe_b64encode(json.dumps([max(pks)]).encode()).decode()
+
+
+def already_reminded(state, order_ids):
+    marks = ",".join("?" * len(order_ids))
+    rows = state.execute(f"SELECT order_id FROM reminded WHERE order_id IN ({marks})", order_ids)
+    return {order_id for order_id, in rows}
+
+
+def commit_batch(state, cursor, order_ids, sent_at):
+    with state:
+        state.executemany(
+            "INSERT OR IGNORE INTO reminded (order_id, sent_at) VALUES (?, ?)",
+            [(order_id, sent_at) for order_id in order_ids],
+        )
+        state.execute("INSERT OR REPLACE INTO checkpoint (id, cursor) VALUES (1, ?)", (cursor,))
+
+
+def pages(client, since, until, batch_size, cursor):
+    while True:
+        result = client.execute(QUERY, variable_values={
+            "orderDate": [since.isoformat(), until.isoformat()],
+            "first": batch_size,
+            "after": cursor,
+        })
+        connection = result["allOrders"]
+        cursor = connection["pageInfo"]["endCursor"] or cursor
+        yield [edge["node"] for edge in connection["edges"]], cursor
+        if not connection["pageInfo"]["hasNextPage"]:
+            return
+
+
+def remind(client, state, since, until, batch_size, cursor):
+    sent = skipped = 0
+    for orders, cursor in pages(client, since, until, batch_size, cursor):
+        done = already_reminded(state, [order["id"] for order in orders]) if orders else set()
+        todo = [order for order in orders if order["id"] not in done]
+        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        with open(LOG_FILE, "a") as log:
+            for order in todo:
+                log.write(
+                    f"{timestamp} - Reminder logged for Order ID: {order['id']}, Email: {order['customer']['email']}\n"
+                )
+        commit_batch(state, cursor, [order["id"] for order in todo], until.isoformat())
+        sent += len(todo)
+        skipped += len(done)
+    return sent, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Log reminders for recent orders, resuming from the last checkpoint.")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--state", default=STATE_FILE)
+    parser.add_argument("--restart", action="store_true",
+                        help="Forget the checkpoint and walk the whole window (the ledger still skips repeats).")
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    since = now - WINDOW
+    state = open_state(args.state)
+    with state:
+        state.execute("DELETE FROM reminded WHERE sent_at < ?", (since.isoformat(),))
+        if args.restart:
+            state.execute("DELETE FROM checkpoint")
 
-    # GraphQL client
     transport = RequestsHTTPTransport(
         url=GRAPHQL_ENDPOINT,
         verify=True,
         retries=3,
     )
-
     client = Client(
         transport=transport,
         fetch_schema_from_transport=False,
     )
 
-    # Execute query
-    result = client.execute(query, variable_values={"since": seven_days_ago})
+    cursor = load_cursor(state)
+    try:
+        sent, skipped = remind(client, state, since, now, args.batch_size, cursor)
+    except TransportQueryError as error:
+        # only the saved checkpoint can be rejected, and only before any batch moved it
+        if cursor is None or load_cursor(state) != cursor or "cursor" not in str(error).lower():
+            raise
+        with state:
+            state.execute("DELETE FROM checkpoint")
+        sent, skipped = remind(client, state, since, now, args.batch_size, ledger_cursor(state))
 
-    orders = result.get("orders", [])
-
-    # Log reminders
-    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-
-    with open(LOG_FILE, "a") as log:
-        for order in orders:
-            order_id = order["id"]
-            email = order["customer"]["email"]
-            log.write(
-                f"{timestamp} - Reminder logged for Order ID: {order_id}, Email: {email}\n"
-            )
-
-    print("Order reminders processed!")
+    state.close()
+    print(f"Order reminders processed! {sent} sent, {skipped} already reminded.")
 
 
 if __name__ == "__main__":
@@ -68,14 +187,12 @@ from gql.transport.requests import RequestsHTTPTransport
 
 pip install gql requests
 
-seven_days_ago = (datetime.utcnow() - timedelta(days=7)).isoformat()
+since = datetime.utcnow() - timedelta(days=7)  # orders up to the checkpoint id are skipped
 
-query GetRecentOrders($since: DateTime!) {
-    orders(orderDate_Gte: $since, status: "PENDING") {
-        id
-        customer {
-            email
-        }
+query RemindableOrders($orderDate: [DateTime], $first: Int!, $after: String) {
+    allOrders(orderDate: $orderDate, orderBy: "id", first: $first, after: $after) {
+        edges { node { id customer { email } } }
+        pageInfo { hasNextPage endCursor }
     }
 }
 
@@ -89,7 +206,13 @@ chmod +x crm/cron_jobs/send_order_reminders.py
 
 crm/cron_jobs/order_reminders_crontab.txt
 
-0 8 * * * /usr/bin/python3 /path/to/your/project/crm/cron_jobs/send_order_reminders.py >> /tmp/order_reminders_cron.log 2>&1
+# Replaced by the 'order-reminders' Celery beat entry (crm.pipeline.run_reminder_pipeline),
+# which records reminders in the database; don't install both schedules.
+# Run the script by hand only where Celery isn't deployed:
+# 0 8 * * * /usr/bin/python3 /path/to/your/project/crm/cron_jobs/send_order_reminders.py >> /tmp/order_reminders_cron.log 2>&1
+
+# checkpoint + ledger of reminded orders; delete it (or pass --restart) to re-walk the window
+/tmp/order_reminders_state.sqlite3
 
 0 8 * * *
 
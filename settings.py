@@ -15,10 +15,9 @@ crm/cron.py
 
 #crm/cron.py
 from datetime import datetime
-import requests
+from crm.executor import run_operation
 
 LOG_FILE = "/tmp/crm_heartbeat_log.txt"
-GRAPHQL_ENDPOINT = "http://localhost:8000/graphql"
 
 
 def log_crm_heartbeat():
@@ -30,14 +29,10 @@ def log_crm_heartbeat():
     timestamp = datetime.now().strftime("%d/%m/%Y-%H:%M:%S")
     message = f"{timestamp} CRM is alive"
 
-    # Optional GraphQL health check
+    # Optional GraphQL health check (in-process by default, see crm/executor.py)
     try:
-        response = requests.post(
-            GRAPHQL_ENDPOINT,
-            json={"query": "{ hello }"},
-            timeout=5,
-        )
-        if response.status_code == 200:
+        response = run_operation("{ hello }")
+        if not response.get("errors"):
             message += " | GraphQL OK"
         else:
             message += " | GraphQL ERROR"
@@ -78,8 +73,8 @@ CRM is alive | GraphQL UNREACHABLE
 
 # crm/schema.py
 import graphene
-from django.utils import timezone
-from products.models import Product
+from graphql import GraphQLError
+from .inventory import count_low_stock, restock_low_stock
 
 
 class UpdatedProductType(graphene.ObjectType):
@@ -90,36 +85,42 @@ class UpdatedProductType(graphene.ObjectType):
 class UpdateLowStockProducts(graphene.Mutation):
     success = graphene.Boolean()
     message = graphene.String()
+    count = graphene.Int()
     updated_products = graphene.List(UpdatedProductType)
 
     class Arguments:
-        pass  # No external arguments needed
-
-    def mutate(self, info):
-        low_stock_products = Product.objects.filter(stock__lt=10)
-
-        updated = []
-
-        for product in low_stock_products:
-            product.stock += 10
-            product.save()
-
-            updated.append(
-                UpdatedProductType(
-                    name=product.name,
-                    stock=product.stock,
-                )
+        threshold = graphene.Int(required=False, default_value=10)
+        increment = graphene.Int(required=False, default_value=10)
+        dry_run = graphene.Boolean(required=False, default_value=False)
+
+    def mutate(self, info, threshold=10, increment=10, dry_run=False):
+        if threshold < 0:
+            raise GraphQLError("Threshold cannot be negative.")
+        if increment < 1:
+            raise GraphQLError("Increment must be positive.")
+
+        if dry_run:
+            count = count_low_stock(threshold)
+            return UpdateLowStockProducts(
+                success=True,
+                message=f"{count} products would be restocked",
+                count=count,
+                updated_products=[],
             )
 
+        # One UPDATE ... SET stock = stock + increment WHERE stock < threshold
+        updated = restock_low_stock(threshold, increment)
+
         return UpdateLowStockProducts(
             success=True,
             message="Low stock products updated successfully",
-            updated_products=updated,
+            count=len(updated),
+            updated_products=[UpdatedProductType(name=name, stock=stock) for _, name, stock in updated],
         )
 
 # crm/cron.py
 import datetime
-import requests
+from crm.executor import run_operation
 
 def update_low_stock():
     log_file_path = '/tmp/low_stock_updates_log.txt'
@@ -129,21 +130,24 @@ def update_low_stock():
     mutation {
         updateLowStockProducts {
             success
-            updatedProducts
+            updatedProducts {
+                name
+                stock
+            }
         }
     }
     """
     
     try:
-        response = requests.post("http://localhost:8000/graphql", json={'query': mutation})
-        data = response.json().get('data', {}).get('updateLowStockProducts', {})
+        response = run_operation(mutation)
+        data = (response.get('data') or {}).get('updateLowStockProducts') or {}
         
         if data.get('success'):
             products = data.get('updatedProducts', [])
             with open(log_file_path, 'a') as f:
                 if products:
                     for p in products:
-                        f.write(f"[{now}] Updated: {p}\n")
+                        f.write(f"[{now}] Product: {p['name']}, New Stock: {p['stock']}\n")
                 else:
                     f.write(f"[{now}] No low stock products found.\n")
     except Exception as e:
@@ -207,12 +211,45 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'crm.tasks.generate_crm_report',
         'schedule': crontab(day_of_week='mon', hour=6, minute=0), # Monday 6 AM
     },
+    'update-crm-rollups': {
+        'task': 'crm.tasks.update_crm_rollups',
+        'schedule': crontab(minute='*/5'),
+    },
+    # the only reminder schedule: replaces the 0 8 * * * crontab line for
+    # send_order_reminders.py (crm/cron_jobs/order_reminders_crontab.txt)
+    'order-reminders': {
+        'task': 'crm.pipeline.run_reminder_pipeline',
+        'schedule': crontab(hour=8, minute=0),
+    },
+}
+
+# Fan-out pipelines (crm/pipeline.py)
+CRM_PIPELINE_CHUNK_SIZE = 5000
+CRM_PIPELINE_CONCURRENCY = 4
+CELERY_TASK_ANNOTATIONS = {
+    'crm.pipeline.remind_orders_chunk': {'rate_limit': '60/m'},
+}
+CELERY_TASK_ROUTES = {
+    'crm.pipeline.*_chunk': {'queue': 'crm_chunks'},
 }
+# Rows younger than this are left for the next rollup fold (crm/rollups.py)
+CRM_ROLLUP_SETTLE_SECONDS = 60
+
+# Chords need a result backend
+CELERY_RESULT_BACKEND = 'redis://localhost:6379/1'
+
+# Tests: no Redis needed
+# CELERY_BROKER_URL = 'memory://'
+# CELERY_RESULT_BACKEND = 'cache+memory://'
+# CELERY_TASK_ALWAYS_EAGER = True
 
 #crm/tasks.py
 import datetime
-import requests
 from celery import shared_task
+from crm.executor import run_operation
+from crm.rollups import fold_rollups, period_totals
+# chunked fan-out pipelines (crm/pipeline.py); imported so the worker registers them
+from crm.pipeline import run_reminder_pipeline, run_report_pipeline  # noqa: F401
 
 @shared_task
 def generate_crm_report():
@@ -224,15 +261,24 @@ def generate_crm_report():
     }
     """
     try:
-        response = requests.post("http://localhost:8000/graphql", json={'query': query})
-        data = response.json().get('data', {})
+        response = run_operation(query)
+        data = response.get('data') or {}
         
         customers = data.get('totalCustomers', 0)
         orders = data.get('totalOrders', 0)
         revenue = data.get('totalRevenue', 0)
+
+        # Weekly figures from the daily rollups: only rows added since the
+        # last run are read (crm/rollups.py)
+        fold_rollups()
+        week = period_totals(days=7)
         
         timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_msg = f"{timestamp} - Report: {customers} customers, {orders} orders, {revenue} revenue\n"
+        log_msg = (
+            f"{timestamp} - Report: {customers} customers, {orders} orders, {revenue} revenue"
+            f" | last 7 days: {week['new_customers']} new customers, {week['orders']} orders,"
+            f" {week['revenue']} revenue\n"
+        )
         
         with open('/tmp/crm_report_log.txt', 'a') as f:
             f.write(log_msg)
@@ -240,6 +286,11 @@ def generate_crm_report():
     except Exception as e:
         print(f"Error generating report: {e}")
 
+@shared_task
+def update_crm_rollups():
+    """Fold new customers/orders into the daily rollups behind salesSummary and the report."""
+    return fold_rollups()
+
 #crm/README.md
 # CRM Task Automation Setup
 
@@ -253,10 +304,13 @@ def generate_crm_report():
 
 ### 3. Running the System
 You need three separate terminal windows:
-1. **Django:** `python manage.py runserver`
-2. **Worker:** `celery -A crm worker -l info` (Executes the tasks)
+1. **Django:** `python manage.py runserver` (the tasks run their GraphQL queries in-process, so they don't depend on it unless `CRM_GRAPHQL_TRANSPORT = "http"`)
+2. **Worker:** `celery -A crm worker -Q celery,crm_chunks -l info` (Executes the tasks, including the reminder/report chunk tasks routed to `crm_chunks`)
 3. **Beat:** `celery -A crm beat -l info` (Schedules the tasks)
 
+To scale the chunk tasks out, add workers for their queue alone:
+`celery -A crm worker -Q crm_chunks -c 8 -l info`
+
 ### 4. Verification
 Check the logs at `/tmp/crm_report_log.txt` to see the generated weekly reports.
 
@@ -0,0 +1,101 @@
+# crm/stats.py
+"""
+Incrementally maintained CRM totals.
+
+Every customer/order insert or delete adjusts ``CRMStats`` with an
+``UPDATE ... SET total = total + delta`` in the same transaction as the
+write, so reading the totals is a sum over ``STATS_SHARDS`` rows whatever
+the size of the tables.
+
+Saves and deletes are tracked by signals (cascades included). Code that
+writes without signals -- ``bulk_create``, ``QuerySet.update`` of
+``total_amount`` -- must call ``adjust_stats`` itself.
+"""
+import random
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.signals import post_delete, post_save
+
+from .models import CRMStats, Customer, Order
+
+STATS_SHARDS = 8
+
+
+def adjust_stats(customers=0, orders=0, revenue=0):
+    """Add the given deltas to a random shard row."""
+    if not (customers or orders or revenue):
+        return
+    shard = random.randrange(STATS_SHARDS)
+    updated = CRMStats.objects.filter(shard=shard).update(
+        total_customers=F("total_customers") + customers,
+        total_orders=F("total_orders") + orders,
+        total_revenue=F("total_revenue") + revenue,
+    )
+    if not updated:
+        with transaction.atomic():
+            CRMStats.objects.get_or_create(shard=shard)
+        adjust_stats(customers, orders, revenue)
+
+
+def get_stats():
+    """``{"total_customers", "total_orders", "total_revenue"}``"""
+    totals = CRMStats.objects.aggregate(
+        total_customers=Sum("total_customers"),
+        total_orders=Sum("total_orders"),
+        total_revenue=Sum("total_revenue"),
+    )
+    return {
+        "total_customers": totals["total_customers"] or 0,
+        "total_orders": totals["total_orders"] or 0,
+        "total_revenue": totals["total_revenue"] or Decimal("0"),
+    }
+
+
+def get_request_stats(context):
+    """``get_stats()`` read once per request and kept on ``context``."""
+    if context is None:
+        return get_stats()
+    stats = getattr(context, "crm_stats", None)
+    if stats is None:
+        stats = context.crm_stats = get_stats()
+    return stats
+
+
+@transaction.atomic
+def rebuild_stats():
+    """Recompute the totals from the base tables (one COUNT/SUM each)."""
+    revenue = Order.objects.aggregate(revenue=Sum("total_amount"))["revenue"] or Decimal("0")
+    CRMStats.objects.select_for_update().all().delete()
+    CRMStats.objects.create(
+        shard=0,
+        total_customers=Customer.objects.count(),
+        total_orders=Order.objects.count(),
+        total_revenue=revenue,
+    )
+    return get_stats()
+
+
+def _customer_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust_stats(customers=1)
+
+
+def _customer_deleted(sender, instance, **kwargs):
+    adjust_stats(customers=-1)
+
+
+def _order_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust_stats(orders=1, revenue=instance.total_amount or 0)
+
+
+def _order_deleted(sender, instance, **kwargs):
+    adjust_stats(orders=-1, revenue=-(instance.total_amount or 0))
+
+
+post_save.connect(_customer_saved, sender=Customer, dispatch_uid="crm_stats_customer_saved")
+post_delete.connect(_customer_deleted, sender=Customer, dispatch_uid="crm_stats_customer_deleted")
+post_save.connect(_order_saved, sender=Order, dispatch_uid="crm_stats_order_saved")
+post_delete.connect(_order_deleted, sender=Order, dispatch_uid="crm_stats_order_deleted")
@@ -31,12 +31,45 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'crm.tasks.generate_crm_report',
         'schedule': crontab(day_of_week='mon', hour=6, minute=0), # Monday 6 AM
     },
+    'update-crm-rollups': {
+        'task': 'crm.tasks.update_crm_rollups',
+        'schedule': crontab(minute='*/5'),
+    },
+    # the only reminder schedule: replaces the 0 8 * * * crontab line for
+    # send_order_reminders.py (crm/cron_jobs/order_reminders_crontab.txt)
+    'order-reminders': {
+        'task': 'crm.pipeline.run_reminder_pipeline',
+        'schedule': crontab(hour=8, minute=0),
+    },
+}
+
+# Fan-out pipelines (crm/pipeline.py)
+CRM_PIPELINE_CHUNK_SIZE = 5000
+CRM_PIPELINE_CONCURRENCY = 4
+CELERY_TASK_ANNOTATIONS = {
+    'crm.pipeline.remind_orders_chunk': {'rate_limit': '60/m'},
+}
+CELERY_TASK_ROUTES = {
+    'crm.pipeline.*_chunk': {'queue': 'crm_chunks'},
 }
+# Rows younger than this are left for the next rollup fold (crm/rollups.py)
+CRM_ROLLUP_SETTLE_SECONDS = 60
+
+# Chords need a result backend
+CELERY_RESULT_BACKEND = 'redis://localhost:6379/1'
+
+# Tests: no Redis needed
+# CELERY_BROKER_URL = 'memory://'
+# CELERY_RESULT_BACKEND = 'cache+memory://'
+# CELERY_TASK_ALWAYS_EAGER = True
 
 #crm/tasks.py
 import datetime
-import requests
 from celery import shared_task
+from crm.executor import run_operation
+from crm.rollups import fold_rollups, period_totals
+# chunked fan-out pipelines (crm/pipeline.py); imported so the worker registers them
+from crm.pipeline import run_reminder_pipeline, run_report_pipeline  # noqa: F401
 
 @shared_task
 def generate_crm_report():
@@ -48,15 +81,24 @@ def generate_crm_report():
     }
     """
     try:
-        response = requests.post("http://localhost:8000/graphql", json={'query': query})
-        data = response.json().get('data', {})
+        response = run_operation(query)
+        data = response.get('data') or {}
         
         customers = data.get('totalCustomers', 0)
         orders = data.get('totalOrders', 0)
         revenue = data.get('totalRevenue', 0)
+
+        # Weekly figures from the daily rollups: only rows added since the
+        # last run are read (crm/rollups.py)
+        fold_rollups()
+        week = period_totals(days=7)
         
         timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_msg = f"{timestamp} - Report: {customers} customers, {orders} orders, {revenue} revenue\n"
+        log_msg = (
+            f"{timestamp} - Report: {customers} customers, {orders} orders, {revenue} revenue"
+            f" | last 7 days: {week['new_customers']} new customers, {week['orders']} orders,"
+            f" {week['revenue']} revenue\n"
+        )
         
         with open('/tmp/crm_report_log.txt', 'a') as f:
             f.write(log_msg)
@@ -64,6 +106,11 @@ def generate_crm_report():
     except Exception as e:
         print(f"Error generating report: {e}")
 
+@shared_task
+def update_crm_rollups():
+    """Fold new customers/orders into the daily rollups behind salesSummary and the report."""
+    return fold_rollups()
+
 #crm/README.md
 # CRM Task Automation Setup
 
@@ -77,10 +124,13 @@ def generate_crm_report():
 
 ### 3. Running the System
 You need three separate terminal windows:
-1. **Django:** `python manage.py runserver`
-2. **Worker:** `celery -A crm worker -l info` (Executes the tasks)
+1. **Django:** `python manage.py runserver` (the tasks run their GraphQL queries in-process, so they don't depend on it unless `CRM_GRAPHQL_TRANSPORT = "http"`)
+2. **Worker:** `celery -A crm worker -Q celery,crm_chunks -l info` (Executes the tasks, including the reminder/report chunk tasks routed to `crm_chunks`)
 3. **Beat:** `celery -A crm beat -l info` (Schedules the tasks)
 
+To scale the chunk tasks out, add workers for their queue alone:
+`celery -A crm worker -Q crm_chunks -c 8 -l info`
+
 ### 4. Verification
 Check the logs at `/tmp/crm_report_log.txt` to see the generated weekly reports.
 
@@ -0,0 +1,149 @@
+# crm/tests.py
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Sum
+from django.test import RequestFactory, TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from graphene_django.settings import graphene_settings
+
+from .models import Customer, Order, OrderItem, Product
+
+ORDERS_QUERY = "{ orders { id customer { name } products { name } } }"
+ALL_ORDERS_QUERY = """
+query ($first: Int!) {
+    allOrders(first: $first) {
+        edges { node { id customer { name } products { edges { node { name } } } } }
+    }
+}
+"""
+CREATE_ORDER = """
+mutation ($customerId: ID!, $items: [OrderItemInput]) {
+    createOrder(customerId: $customerId, items: $items) { order { id } }
+}
+"""
+BULK_CREATE_ORDERS = """
+mutation ($orders: [BulkOrderInput]!) {
+    bulkCreateOrders(orders: $orders) { orders { id } errors }
+}
+"""
+
+N = 5
+
+
+class OrderRelationQueryCountTests(TestCase):
+    """``customer`` and ``products`` load in one batch per request, whatever the row count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = Product.objects.bulk_create(
+            Product(name=f"Product {i}", price=Decimal("10.00"), stock=100) for i in range(3)
+        )
+
+    def create_orders(self, count):
+        start = Customer.objects.count()
+        customers = Customer.objects.bulk_create(
+            Customer(name=f"Customer {i}", email=f"customer{i}@example.com")
+            for i in range(start, start + count)
+        )
+        orders = Order.objects.bulk_create(Order(customer=customer) for customer in customers)
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product=product, quantity=1, unit_price=product.price)
+            for order in orders
+            for product in self.products
+        )
+
+    def execute(self, query, variables=None):
+        context = RequestFactory().post("/graphql")
+        result = graphene_settings.SCHEMA.execute(query, variables=variables, context_value=context)
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def assertConstantQueries(self, run):
+        self.create_orders(N)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(run(N), N)
+        # one query for the orders (+ joined customers), one for the products
+        self.assertLessEqual(len(queries), 3)
+
+        self.create_orders(9 * N)
+        with self.assertNumQueries(len(queries)):
+            self.assertEqual(run(10 * N), 10 * N)
+
+    def test_orders(self):
+        def run(count):
+            orders = self.execute(ORDERS_QUERY)["orders"]
+            self.assertTrue(all(order["customer"]["name"] and len(order["products"]) == 3 for order in orders))
+            return len(orders)
+
+        self.assertConstantQueries(run)
+
+    def test_all_orders(self):
+        def run(count):
+            edges = self.execute(ALL_ORDERS_QUERY, {"first": count})["allOrders"]["edges"]
+            self.assertTrue(all(
+                edge["node"]["customer"]["name"] and len(edge["node"]["products"]["edges"]) == 3
+                for edge in edges
+            ))
+            return len(edges)
+
+        self.assertConstantQueries(run)
+
+
+# SQLite serializes writers on a database lock, so only row-locking backends
+# exercise the conditional updates concurrently
+@skipUnlessDBFeature("has_select_for_update")
+class StockReservationConcurrencyTests(TransactionTestCase):
+    """Concurrent createOrder / bulkCreateOrders never oversell."""
+
+    STOCK = 50
+    REQUESTS = 40
+    BULK_SIZE = 5
+
+    def setUp(self):
+        self.customer = Customer.objects.create(name="Buyer", email="buyer@example.com")
+        self.products = [
+            Product.objects.create(name=f"Product {i}", price=Decimal("5.00"), stock=self.STOCK) for i in range(2)
+        ]
+
+    def execute(self, query, variables):
+        try:
+            result = graphene_settings.SCHEMA.execute(
+                query, variables=variables, context_value=RequestFactory().post("/graphql")
+            )
+            return result.errors, result.data
+        finally:
+            # each worker thread opened its own connection
+            connection.close()
+
+    def place(self, request):
+        items = [{"productId": str(product.pk), "quantity": 1} for product in self.products]
+        if request % 2:
+            errors, data = self.execute(CREATE_ORDER, {"customerId": str(self.customer.pk), "items": items})
+            return 0 if errors else 1, [str(error) for error in errors or ()]
+        orders = [{"customerId": str(self.customer.pk), "items": items}] * self.BULK_SIZE
+        errors, data = self.execute(BULK_CREATE_ORDERS, {"orders": orders})
+        if errors:
+            return 0, [str(error) for error in errors]
+        result = data["bulkCreateOrders"]
+        return len(result["orders"]), result["errors"]
+
+    def test_no_overselling(self):
+        # demand (20 + 20 * 5 units per product) is well over the stock
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            outcomes = list(pool.map(self.place, range(self.REQUESTS)))
+
+        placed = sum(count for count, _ in outcomes)
+        errors = [error for _, request_errors in outcomes for error in request_errors]
+        self.assertEqual([error for error in errors if "Insufficient stock" not in error], [])
+        self.assertEqual(Order.objects.count(), placed)
+
+        sold = dict(
+            OrderItem.objects.values("product_id").annotate(units=Sum("quantity")).values_list("product_id", "units")
+        )
+        for product in self.products:
+            product.refresh_from_db()
+            self.assertGreaterEqual(product.stock, 0)
+            self.assertEqual(sold.get(product.pk, 0), placed)
+            self.assertEqual(product.stock + sold.get(product.pk, 0), self.STOCK)
@@ -0,0 +1,260 @@
+# crm/views.py
+"""
+GraphQL endpoint for the CRM.
+
+``CRMGraphQLView`` is graphene-django's ``GraphQLView`` with:
+
+* the parse and validate step served from ``crm.document_cache``, plus
+  automatic persisted query support;
+* static cost/depth analysis (``crm.cost``) that rejects expensive operations
+  before execution and reports the cost under ``extensions.cost``;
+* a response cache for queries (``crm.response_cache``), invalidated by the
+  mutations that write to the tables a query reads;
+* idempotency keys (``crm.idempotency``): a retried request replays the
+  stored response instead of running its mutations again;
+* batches: a JSON array of operations is run in one request and answered
+  with an array of results, in order. The entries share the request context,
+  so DataLoaders and per-request stats are reused from one to the next. Both
+  are reset after a mutation, so later entries don't read stale values.
+  At most ``GRAPHQL_MAX_BATCH_SIZE`` entries are accepted.
+"""
+import json
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import HttpResponseBadRequest, HttpResponseNotAllowed
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView, HttpError
+from graphql import ExecutionResult, GraphQLError, OperationType, execute, get_operation_ast, validate_schema
+
+from .cost import check_query_cost
+from .document_cache import document_cache, resolve_persisted_query
+from . import idempotency
+from .response_cache import get_response as get_cached_response
+from .response_cache import (
+    invalidate_on_commit,
+    response_cache_enabled,
+    response_key,
+    set_response,
+    written_models,
+)
+
+
+def get_max_batch_size():
+    return getattr(settings, "GRAPHQL_MAX_BATCH_SIZE", 20)
+
+
+class CRMGraphQLView(GraphQLView):
+    document_cache = document_cache
+    batch_index = 0
+
+    def parse_body(self, request):
+        if self.get_content_type(request) != "application/json":
+            return super().parse_body(request)
+        try:
+            data = json.loads(request.body.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            raise HttpError(HttpResponseBadRequest("POST body sent invalid JSON."))
+        # an array body is a batch, whatever the view was configured with
+        if isinstance(data, list):
+            if not data or len(data) > get_max_batch_size():
+                raise HttpError(HttpResponseBadRequest(
+                    f"A batch must hold 1 to {get_max_batch_size()} operations."
+                ))
+            if not all(isinstance(entry, dict) for entry in data):
+                raise HttpError(HttpResponseBadRequest("Every batch entry must be a JSON query object."))
+            self.batch = True
+            return data
+        if not isinstance(data, dict):
+            raise HttpError(HttpResponseBadRequest("The received data is not a valid JSON query."))
+        self.batch = False
+        return data
+
+    def get_graphql_params(self, request, data):
+        query, variables, operation_name, id = super().get_graphql_params(request, data)
+
+        extensions = request.GET.get("extensions") or data.get("extensions")
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+        request.graphql_extensions = extensions or {}
+        return query, variables, operation_name, id
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, show_graphiql=False):
+        try:
+            query = resolve_persisted_query(query, getattr(request, "graphql_extensions", None))
+        except GraphQLError as error:
+            return ExecutionResult(data=None, errors=[error])
+
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        document, validation_errors = self.document_cache.parse_and_validate(
+            schema, query, self.validation_rules, graphene_settings.MAX_VALIDATION_ERRORS,
+        )
+        if document is None:
+            return ExecutionResult(data=None, errors=validation_errors)
+
+        operation_ast = get_operation_ast(document, operation_name)
+
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    "Can only perform a {} operation from a POST request.".format(operation_ast.operation.value),
+                )
+            )
+
+        if validation_errors:
+            return ExecutionResult(data=None, errors=validation_errors)
+
+        try:
+            cost, cost_errors = check_query_cost(schema, document, operation_name, variables)
+        except Exception as e:
+            return ExecutionResult(data=None, errors=[e])
+        extensions = {"cost": cost} if cost else {}
+        if cost_errors:
+            return ExecutionResult(data=None, errors=cost_errors, extensions=extensions)
+
+        operation = operation_ast.operation if operation_ast is not None else None
+        cache_key = None
+        if operation == OperationType.QUERY and response_cache_enabled():
+            cache_key = response_key(schema, document, operation_ast, variables)
+            data = get_cached_response(cache_key)
+            extensions["responseCache"] = "HIT" if data is not None else "MISS"
+            if data is not None:
+                return ExecutionResult(data=data, extensions=extensions)
+
+        try:
+            execute_options = {
+                "root_value": self.get_root_value(request),
+                "context_value": self.get_context(request),
+                "variable_values": variables,
+                "operation_name": operation_name,
+                "middleware": self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                execute_options["execution_context_class"] = self.execution_context_class
+
+            if (
+                operation == OperationType.MUTATION
+                and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+                )
+            ):
+                with transaction.atomic():
+                    result = self.execute_operation(schema, document, operation_ast, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+            else:
+                result = self.execute_operation(schema, document, operation_ast, **execute_options)
+        except Exception as e:
+            return ExecutionResult(errors=[e], extensions=extensions or None)
+        finally:
+            if operation == OperationType.MUTATION:
+                invalidate_on_commit(*written_models(operation_ast))
+                self.reset_request_caches(request)
+
+        if cache_key is not None and not result.errors:
+            set_response(cache_key, result.data)
+        if extensions:
+            result.extensions = {**(result.extensions or {}), **extensions}
+        return result
+
+    def execute_operation(self, schema, document, operation_ast, **execute_options):
+        return execute(schema, document, **execute_options)
+
+    def reset_request_caches(self, request):
+        context = self.get_context(request)
+        for attr in ("loaders", "crm_stats"):
+            vars(context).pop(attr, None)
+
+    def get_response(self, request, data, show_graphiql=False):
+        index = None
+        if self.batch:
+            index, self.batch_index = self.batch_index, self.batch_index + 1
+            # one entry's failed mutation must not roll back the next entry's
+            vars(request).pop(MUTATION_ERRORS_FLAG, None)
+        try:
+            key = idempotency.get_idempotency_key(request, data, index)
+            if key is None:
+                return self.execute_response(request, data, show_graphiql)
+
+            query, variables, operation_name, _ = self.get_graphql_params(request, data)
+            digest = idempotency.fingerprint(query, variables, operation_name)
+            replay = idempotency.begin(key, digest)
+        except idempotency.IdempotencyError as e:
+            return self.json_encode(request, {"errors": [{"message": str(e)}]}), e.status
+        if replay is not None:
+            return replay
+
+        try:
+            with idempotency.held(key):
+                result, status_code = self.execute_response(request, data, show_graphiql)
+        except BaseException:
+            idempotency.release(key)
+            raise
+        idempotency.complete(key, digest, result, status_code)
+        return result, status_code
+
+    def execute_response(self, request, data, show_graphiql=False):
+        # Same as GraphQLView.get_response, plus the result's extensions
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        status_code = 200
+        if execution_result:
+            if execution_result.errors:
+                set_rollback()
+            response, status_code = self.format_result(execution_result)
+
+            if self.batch:
+                response["id"] = id
+                response["status"] = status_code
+
+            result = self.json_encode(request, response, pretty=show_graphiql)
+        else:
+            result = None
+
+        return result, status_code
+
+    def format_result(self, execution_result):
+        """The response body (before JSON encoding) and status for a result."""
+        response = {}
+        status_code = 200
+        if execution_result.errors:
+            response["errors"] = [self.format_error(e) for e in execution_result.errors]
+
+        if execution_result.errors and any(not getattr(e, "path", None) for e in execution_result.errors):
+            status_code = 400
+        else:
+            response["data"] = execution_result.data
+
+        if execution_result.extensions:
+            response["extensions"] = execution_result.extensions
+        return response, status_code